@@ -2,11 +2,13 @@
 
 import logging
 import sys
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.routers import actions, openclaw_proxy, proxy, sms, voice
+from app.services import filler, workspace
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,7 +16,16 @@ logging.basicConfig(
     stream=sys.stderr,
 )
 
-app = FastAPI(title="Twilio Proxy", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled HTTP connections held by shared service clients.
+    await workspace.close_client()
+    await filler.close_client()
+
+
+app = FastAPI(title="Twilio Proxy", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
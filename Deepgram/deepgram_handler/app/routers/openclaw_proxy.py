@@ -9,6 +9,7 @@ import asyncio
 import json
 import logging
 import random
+import re
 from typing import AsyncIterator
 
 import httpx
@@ -16,6 +17,7 @@ from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 
 from app.config import get_settings
+from app.services.deepgram_agent import build_inject_message
 from app.services.filler import generate_filler_phrase
 from app.services.session_registry import get_ws
 
@@ -25,6 +27,11 @@ router = APIRouter(tags=["openclaw-proxy"])
 
 OPENCLAW_BASE = "http://localhost:18789"
 
+# Request headers that must not be forwarded verbatim to the gateway.
+_STRIPPED_REQUEST_HEADERS: frozenset[str] = frozenset(
+    {"host", "content-length", "transfer-encoding"}
+)
+
 # OpenClaw injects these markers into the conversation history sent to the
 # LLM.  Smaller models sometimes echo them back in their response, which is
 # harmless in text but gets spoken aloud by TTS.  We strip them at the byte
@@ -34,36 +41,98 @@ _STRIP_MARKERS: list[bytes] = [
     b"[Chat messages since your last reply - for context]",
 ]
 _MAX_MARKER_LEN = max(len(m) for m in _STRIP_MARKERS)
+# Shared by every marker; SSE framing ('"choices":[{') never contains it, so
+# a memchr-speed ``in`` check clears almost every chunk without a scan.
+_MARKER_PREFIX = b"[C"
+# Events end with a blank line; markers never contain one.
+_SSE_EVENT_ENDS = (b"\n\n", b"\r\n\r\n")
+# Non-SSE bodies are forwarded in pieces of at least this size.
+_FLUSH_BYTES = 4096
+# One alternation removes every marker in a single pass over the buffer.
+_STRIP_RE = re.compile(b"|".join(re.escape(m) for m in _STRIP_MARKERS))
+
+
+def _strip_markers(buf: bytearray) -> None:
+    """Delete every complete marker occurrence from *buf* in place."""
+    # Back to front so earlier match offsets stay valid.
+    for match in reversed(list(_STRIP_RE.finditer(buf))):
+        del buf[match.start() : match.end()]
+
+
+def _events_end(buf: bytearray) -> int:
+    """Return the offset just past the last complete SSE event in *buf*, or 0."""
+    end = 0
+    for sep in _SSE_EVENT_ENDS:
+        i = buf.rfind(sep)
+        if i != -1:
+            end = max(end, i + len(sep))
+    return end
 
 
 async def _filtered_stream(raw_stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
     """Yield bytes from *raw_stream* with known marker strings removed.
 
-    Uses a small carry-over buffer (len = longest marker - 1) so that
-    markers spanning chunk boundaries are caught while adding negligible
-    latency.
+    Upstream reads are coalesced in one reusable ``bytearray``; after each
+    read every complete SSE event is yielded at once and only the
+    unfinished tail is kept.  Bodies that are not SSE are flushed every
+    ``_FLUSH_BYTES``, holding back only the last (longest marker - 1)
+    bytes when a marker could be split across reads.
     """
-    buf = b""
+    buf = bytearray()
     async for chunk in raw_stream:
         buf += chunk
-        # Replace any complete marker occurrences in the buffer.
-        for marker in _STRIP_MARKERS:
-            buf = buf.replace(marker, b"")
-        # Everything except the last (_MAX_MARKER_LEN - 1) bytes is safe to
-        # emit — a partial marker can only start in that trailing window.
-        safe_end = len(buf) - (_MAX_MARKER_LEN - 1)
+        maybe_marker = _MARKER_PREFIX in buf or buf.endswith(_MARKER_PREFIX[:1])
+        if maybe_marker:
+            _strip_markers(buf)
+        # Markers never span an event boundary, so everything up to the
+        # last one is safe to emit.
+        safe_end = _events_end(buf)
+        if len(buf) - safe_end >= _FLUSH_BYTES:
+            # A partial marker can only start in the trailing window.
+            safe_end = len(buf) - (_MAX_MARKER_LEN - 1) if maybe_marker else len(buf)
         if safe_end > 0:
-            yield buf[:safe_end]
-            buf = buf[safe_end:]
+            with memoryview(buf) as view:
+                out = view[:safe_end].tobytes()
+            del buf[:safe_end]
+            yield out
     # Flush the remainder.
-    for marker in _STRIP_MARKERS:
-        buf = buf.replace(marker, b"")
+    _strip_markers(buf)
     if buf:
-        yield buf
+        yield bytes(buf)
+
+
+# OpenClaw serializes requests compactly, so every user turn starts with
+# this; ``rfind`` jumps straight to the last one instead of parsing the
+# whole history.
+_LAST_USER_NEEDLE = b'{"role":"user"'
+_RAW_DECODER = json.JSONDecoder()
+
+
+def _user_message_text(msg: dict) -> str | None:
+    """Return the text of a single user message (plain or multimodal)."""
+    content = msg.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "text":
+                return part.get("text")
+    return None
 
 
 def _extract_last_user_message(body: bytes) -> str | None:
     """Extract the last user message text from an OpenAI-format request body."""
+    idx = body.rfind(_LAST_USER_NEEDLE)
+    if idx != -1:
+        # Decode only that message object; raw_decode stops at its end.
+        try:
+            msg, _ = _RAW_DECODER.raw_decode(body[idx:].decode())
+        except ValueError:
+            msg = None
+        if isinstance(msg, dict):
+            return _user_message_text(msg)
+
+    # Other key orders or spacing: parse the full body.
     try:
         data = json.loads(body)
     except (json.JSONDecodeError, ValueError):
@@ -71,16 +140,8 @@ def _extract_last_user_message(body: bytes) -> str | None:
 
     messages = data.get("messages", [])
     for msg in reversed(messages):
-        if msg.get("role") != "user":
-            continue
-        content = msg.get("content")
-        if isinstance(content, str):
-            return content
-        if isinstance(content, list):
-            for part in content:
-                if isinstance(part, dict) and part.get("type") == "text":
-                    return part.get("text")
-        return None
+        if msg.get("role") == "user":
+            return _user_message_text(msg)
     return None
 
 
@@ -112,7 +173,7 @@ async def proxy_chat_completions(request: Request):
     headers = {
         k: v
         for k, v in request.headers.items()
-        if k.lower() not in ("host", "content-length", "transfer-encoding")
+        if k.lower() not in _STRIPPED_REQUEST_HEADERS
     }
 
     # --- Filler setup ---
@@ -177,9 +238,7 @@ async def proxy_chat_completions(request: Request):
                 return
             try:
                 logger.info("Injecting filler phrase: %s", phrase)
-                await dg_ws.send(
-                    json.dumps({"type": "InjectAgentMessage", "message": phrase})
-                )
+                await dg_ws.send(build_inject_message(phrase))
                 logger.info("Filler phrase injected successfully")
             except Exception:
                 logger.warning("Failed to inject filler phrase", exc_info=True)
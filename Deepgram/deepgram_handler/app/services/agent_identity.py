@@ -11,6 +11,7 @@ import logging
 import re
 from dataclasses import dataclass
 
+from app.services.user_md_parser import may_be_placeholder
 from app.services.workspace import (
     CallInfo,
     call_anthropic,
@@ -41,6 +42,10 @@ IDENTITY_PLACEHOLDERS = {
     "workspace-relative path, http(s) url, or data uri",
 }
 
+_MD_TRANS = str.maketrans("", "", "*_")
+_WS_RE = re.compile(r"\s+")
+_PLACEHOLDER_INITIALS = frozenset(p[0] for p in IDENTITY_PLACEHOLDERS)
+
 IDENTITY_SYSTEM_PROMPT = (
     "Extract the AI agent's self-chosen identity from this phone call transcript. "
     "Focus on how the AGENT introduced or described itself. "
@@ -48,7 +53,8 @@ IDENTITY_SYSTEM_PROMPT = (
     "Return valid JSON only."
 )
 
-IDENTITY_PROMPT_TEMPLATE = (
+# The transcript is appended directly after this prefix.
+IDENTITY_PROMPT_PREFIX = (
     "Extract the AI agent's self-chosen identity from this phone call transcript.\n"
     "Focus on how the AGENT introduced or described itself -- not the caller.\n\n"
     "Return ONLY a JSON object with fields you can confidently extract from the conversation.\n\n"
@@ -63,11 +69,11 @@ IDENTITY_PROMPT_TEMPLATE = (
     '"Wren", "Ember", "Moss", "Sable". Not generic like "Assistant" or "AI".\n'
     "For other fields, only include them if supported by clear evidence in the transcript.\n"
     "Return valid JSON only, no markdown.\n\n"
-    "Transcript:\n{transcript}"
+    "Transcript:\n"
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentIdentity:
     name: str | None = None
     creature: str | None = None
@@ -79,17 +85,19 @@ class AgentIdentity:
 def _normalize_identity_value(value: str) -> str:
     """Normalize a value for placeholder comparison."""
     n = value.strip()
-    n = re.sub(r"^[*_]+|[*_]+$", "", n).strip()
+    n = n.strip("*_").strip()
     if n.startswith("(") and n.endswith(")"):
         n = n[1:-1].strip()
     n = n.replace("\u2013", "-").replace("\u2014", "-")
-    n = re.sub(r"\s+", " ", n).lower()
+    n = _WS_RE.sub(" ", n).lower()
     return n
 
 
 def is_identity_placeholder(value: str) -> bool:
     """Check if a value is a known IDENTITY.md placeholder."""
-    return _normalize_identity_value(value) in IDENTITY_PLACEHOLDERS
+    return may_be_placeholder(value, _PLACEHOLDER_INITIALS) and (
+        _normalize_identity_value(value) in IDENTITY_PLACEHOLDERS
+    )
 
 
 def _strip_frontmatter(content: str) -> str:
@@ -112,8 +120,8 @@ def parse_identity_md(content: str) -> AgentIdentity:
         colon_idx = cleaned.find(":")
         if colon_idx == -1:
             continue
-        label = re.sub(r"[*_]", "", cleaned[:colon_idx]).strip().lower()
-        value = re.sub(r"^[*_]+|[*_]+$", "", cleaned[colon_idx + 1 :]).strip()
+        label = cleaned[:colon_idx].translate(_MD_TRANS).strip().lower()
+        value = cleaned[colon_idx + 1 :].strip("*_").strip()
 
         # Check next line for indented placeholder value
         if not value and i + 1 < len(lines):
@@ -214,7 +222,7 @@ async def extract_agent_identity(settings, call_info: CallInfo) -> None:
             )
             return
 
-        prompt = IDENTITY_PROMPT_TEMPLATE.format(transcript=transcript_text)
+        prompt = IDENTITY_PROMPT_PREFIX + transcript_text
         raw = await call_anthropic(
             settings.OPENCLAW_GATEWAY_TOKEN,
             prompt,
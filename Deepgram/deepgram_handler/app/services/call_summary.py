@@ -28,9 +28,12 @@ SUMMARY_SYSTEM_PROMPT = (
 )
 
 
+_ENTRY_SPLIT_RE = re.compile(r"(?=^### )", re.MULTILINE)
+
+
 def trim_call_entries(content: str, max_entries: int) -> str:
     """Keep the header and the last N call entries."""
-    parts = re.split(r"(?=^### )", content, flags=re.MULTILINE)
+    parts = _ENTRY_SPLIT_RE.split(content)
     header = parts[0] if parts else "# Call History\n\n"
     entries = parts[1:]
 
@@ -10,6 +10,7 @@ import logging
 import os
 import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -47,16 +48,41 @@ IDENTITY_MD_PATH = WORKSPACE_DIR / "IDENTITY.md"
 CALLS_MD_PATH = WORKSPACE_DIR / "test-voice-agent" / "CALLS.md"
 NEXT_GREETING_PATH = WORKSPACE_DIR / "NEXT_GREETING.txt"
 
+# Output payload for the end_call ACK never changes, so encode it once.
+_END_CALL_OUTPUT = json.dumps({"ok": True})
+
+
+def build_inject_message(message: str) -> str:
+    """Build a Deepgram InjectAgentMessage event JSON string."""
+    return json.dumps({"type": "InjectAgentMessage", "message": message})
+
+
+# path -> (st_mtime_ns, st_size, stripped content or None), oldest first.
+# Workspace files are re-read on every call setup but change rarely.
+_FILE_CACHE: OrderedDict[Path, tuple[int, int, str | None]] = OrderedDict()
+_FILE_CACHE_MAX = 32
+
 
 def _read_file(path: Path) -> str | None:
-    """Read a text file if it exists and is non-empty."""
+    """Read a text file if it exists and is non-empty.
+
+    Contents are cached per path and reused while the file's mtime and
+    size are unchanged.
+    """
     try:
-        content = path.read_text().strip()
-        if content:
-            return content
+        st = path.stat()
+        cached = _FILE_CACHE.get(path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            _FILE_CACHE.move_to_end(path)
+            return cached[2]
+        content = path.read_text().strip() or None
     except (FileNotFoundError, PermissionError):
-        pass
-    return None
+        return None
+    _FILE_CACHE[path] = (st.st_mtime_ns, st.st_size, content)
+    _FILE_CACHE.move_to_end(path)
+    if len(_FILE_CACHE) > _FILE_CACHE_MAX:
+        _FILE_CACHE.popitem(last=False)
+    return content
 
 
 def _read_user_context() -> str | None:
@@ -312,87 +338,89 @@ async def _notify_child_sessions(
     Queries the gateway for sessions spawned by this voice call and sends
     each one a message instructing it to deliver results via SMS instead.
     """
-    from app.services.gateway import call_gateway
+    from app.services.gateway import GatewayError, gateway_connection
 
     try:
-        logger.info("Querying child sessions for %s", session_key)
-        result = await call_gateway(
-            method="sessions.list",
-            params={
-                "spawnedBy": session_key,
-                "limit": 50,
-                "includeGlobal": False,
-                "includeUnknown": False,
-            },
-            gateway_url="ws://localhost:18789",
-            gateway_token=settings.OPENCLAW_GATEWAY_TOKEN,
-            timeout=5.0,
-        )
+        # One socket (and one handshake) for the lookup and every notification.
+        async with gateway_connection(
+            gateway_token=settings.OPENCLAW_GATEWAY_TOKEN, timeout=5.0
+        ) as conn:
+            logger.info("Querying child sessions for %s", session_key)
+            result = await conn.call(
+                "sessions.list",
+                {
+                    "spawnedBy": session_key,
+                    "limit": 50,
+                    "includeGlobal": False,
+                    "includeUnknown": False,
+                },
+                timeout=5.0,
+            )
 
-        if not result:
-            logger.info("No child sessions result (gateway returned None)")
-            return
+            if not result:
+                logger.info("No child sessions result (gateway returned None)")
+                return
 
-        sessions = result.get("sessions", [])
-        if not sessions:
-            logger.info("No child sessions found for %s", session_key)
-            return
+            sessions = result.get("sessions", [])
+            if not sessions:
+                logger.info("No child sessions found for %s", session_key)
+                return
 
-        logger.info(
-            "Found %d child session(s) for %s: %s",
-            len(sessions),
-            session_key,
-            [s.get("key", "?") for s in sessions],
-        )
+            logger.info(
+                "Found %d child session(s) for %s: %s",
+                len(sessions),
+                session_key,
+                [s.get("key", "?") for s in sessions],
+            )
 
-        for session in sessions:
-            child_key = session.get("key", "")
-            if not child_key:
-                logger.warning("Child session missing key, skipping: %s", session)
-                continue
+            for session in sessions:
+                child_key = session.get("key", "")
+                if not child_key:
+                    logger.warning("Child session missing key, skipping: %s", session)
+                    continue
 
-            if caller_number:
-                message = (
-                    f"The voice call has ended — the caller is no longer on the phone. "
-                    f"Send your results via SMS to {caller_number}. Use this command:\n"
-                    f'curl -s -X POST http://localhost:8000/actions/send-sms '
-                    f'-H "Content-Type: application/json" '
-                    f'-d \'{{"to": "{caller_number}", "body": "<your results here>"}}\'\n'
-                    f"Do NOT use the message tool — it requires channels that aren't configured. "
-                    f"Use the curl command above instead."
+                if caller_number:
+                    message = (
+                        f"The voice call has ended — the caller is no longer on the phone. "
+                        f"Send your results via SMS to {caller_number}. Use this command:\n"
+                        f'curl -s -X POST http://localhost:8000/actions/send-sms '
+                        f'-H "Content-Type: application/json" '
+                        f'-d \'{{"to": "{caller_number}", "body": "<your results here>"}}\'\n'
+                        f"Do NOT use the message tool — it requires channels that aren't configured. "
+                        f"Use the curl command above instead."
+                    )
+                else:
+                    message = (
+                        "The voice call has ended — the caller is no longer on the phone. "
+                        "If you have results to deliver, send them via SMS using: "
+                        "curl -s -X POST http://localhost:8000/actions/send-sms "
+                        '-H "Content-Type: application/json" '
+                        "-d '{\"to\": \"<phone>\", \"body\": \"<results>\"}'"
+                    )
+
+                idempotency_key = f"call-ended-{session_key}-{child_key}"
+                logger.info(
+                    "Notifying child session %s (caller=%s, idempotencyKey=%s)",
+                    child_key,
+                    caller_number or "unknown",
+                    idempotency_key,
                 )
-            else:
-                message = (
-                    "The voice call has ended — the caller is no longer on the phone. "
-                    "If you have results to deliver, send them via SMS using: "
-                    "curl -s -X POST http://localhost:8000/actions/send-sms "
-                    '-H "Content-Type: application/json" '
-                    "-d '{\"to\": \"<phone>\", \"body\": \"<results>\"}'"
+                notify_result = await conn.call(
+                    "agent",
+                    {
+                        "message": message,
+                        "sessionKey": child_key,
+                        "idempotencyKey": idempotency_key,
+                    },
+                    timeout=10.0,
                 )
+                if notify_result is not None:
+                    logger.info("Child session %s notified successfully", child_key)
+                else:
+                    logger.warning("Child session %s notification failed (gateway returned None)", child_key)
 
-            idempotency_key = f"call-ended-{session_key}-{child_key}"
-            logger.info(
-                "Notifying child session %s (caller=%s, idempotencyKey=%s)",
-                child_key,
-                caller_number or "unknown",
-                idempotency_key,
-            )
-            notify_result = await call_gateway(
-                method="agent",
-                params={
-                    "message": message,
-                    "sessionKey": child_key,
-                    "idempotencyKey": idempotency_key,
-                },
-                gateway_url="ws://localhost:18789",
-                gateway_token=settings.OPENCLAW_GATEWAY_TOKEN,
-                timeout=10.0,
-            )
-            if notify_result is not None:
-                logger.info("Child session %s notified successfully", child_key)
-            else:
-                logger.warning("Child session %s notification failed (gateway returned None)", child_key)
-
+    except GatewayError as exc:
+        logger.warning("Gateway connect failed, child sessions not notified: %s", exc)
     except Exception:
         logger.exception("Failed to notify child sessions")
 
@@ -608,14 +636,11 @@ async def _deepgram_to_twilio(
                         await dg_ws.send(json.dumps({
                             "type": "FunctionCallResponse",
                             "function_call_id": fn_call_id,
-                            "output": json.dumps({"ok": True}),
+                            "output": _END_CALL_OUTPUT,
                         }))
                         # Inject farewell
                         farewell = fn_input.get("farewell", "Goodbye!")
-                        await dg_ws.send(json.dumps({
-                            "type": "InjectAgentMessage",
-                            "message": farewell,
-                        }))
+                        await dg_ws.send(build_inject_message(farewell))
                         end_call_farewell_pending = True
                     else:
                         logger.info("Unhandled function call: %s", fn_name)
@@ -719,9 +744,7 @@ async def run_agent_bridge(
                     "idle_exit_message": settings.IDLE_EXIT_MESSAGE,
                 },
                 SessionTimerCallbacks(
-                    inject_message=lambda msg: dg_ws.send(
-                        json.dumps({"type": "InjectAgentMessage", "message": msg})
-                    ),
+                    inject_message=lambda msg: dg_ws.send(build_inject_message(msg)),
                     end_call=lambda: (stop_event.set(), asyncio.sleep(0))[1],
                     log=lambda msg: logger.info(msg),
                 ),
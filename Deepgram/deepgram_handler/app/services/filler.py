@@ -23,6 +23,25 @@ HAIKU_MODEL = "claude-haiku-4-5-20251001"
 HARD_TIMEOUT_S = 2.0
 MAX_TOKENS = 50
 
+# Request parts that never change; only the API key and prompt vary per call.
+# The headers are set once on the shared client.
+_STATIC_HEADERS = {
+    "Content-Type": "application/json",
+    "anthropic-version": "2023-06-01",
+}
+_STATIC_BODY = {"model": HAIKU_MODEL, "max_tokens": MAX_TOKENS}
+
+# Shared client so back-to-back fillers reuse a warm TLS connection to
+# Anthropic instead of paying a fresh handshake out of the 2s budget.
+_client: httpx.AsyncClient | None = None
+
+# In-flight requests keyed by (message, key, base URL). Concurrent turns that
+# ask for a filler for the same short utterance share a single API call.
+_INFLIGHT: dict[tuple[str, str, str], asyncio.Task[str | None]] = {}
+# Callers still awaiting each shared task; when the last one is cancelled
+# (real content arrived) the request is cancelled too.
+_WAITERS: dict[asyncio.Task[str | None], int] = {}
+
 
 def _build_prompt(user_message: str) -> str:
     return (
@@ -35,6 +54,27 @@ def _build_prompt(user_message: str) -> str:
     )
 
 
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared Anthropic client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            headers=_STATIC_HEADERS,
+            timeout=httpx.Timeout(HARD_TIMEOUT_S, connect=1.0),
+            # No custom transport: it (or a mount) would bypass HTTP(S)_PROXY.
+            limits=httpx.Limits(max_keepalive_connections=4),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared Anthropic client (called on app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 async def generate_filler_phrase(
     user_message: str,
     anthropic_api_key: str,
@@ -51,6 +91,38 @@ async def generate_filler_phrase(
         logger.warning("Haiku filler: no ANTHROPIC_API_KEY set, skipping")
         return None
 
+    key = (user_message, anthropic_api_key, base_url)
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _request_filler(user_message, anthropic_api_key, base_url)
+        )
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda t: _forget(key, t))
+    else:
+        logger.info("Haiku filler: joining in-flight request for the same message")
+    _WAITERS[task] = _WAITERS.get(task, 0) + 1
+    try:
+        # Shielded so one caller being cancelled doesn't cancel the others.
+        return await asyncio.shield(task)
+    finally:
+        _WAITERS[task] -= 1
+        if not _WAITERS[task]:
+            del _WAITERS[task]
+            if not task.done():
+                _forget(key, task)
+                task.cancel()
+
+
+def _forget(key: tuple[str, str, str], task: asyncio.Task[str | None]) -> None:
+    """Drop *task* from the in-flight map unless a newer task owns *key*."""
+    if _INFLIGHT.get(key) is task:
+        del _INFLIGHT[key]
+
+
+async def _request_filler(
+    user_message: str, anthropic_api_key: str, base_url: str
+) -> str | None:
     url = f"{base_url.rstrip('/')}/v1/messages"
     t0 = time.monotonic()
     logger.info(
@@ -58,57 +130,54 @@ async def generate_filler_phrase(
         HAIKU_MODEL, url, HARD_TIMEOUT_S,
     )
     try:
-        async with asyncio.timeout(HARD_TIMEOUT_S):
-            async with httpx.AsyncClient() as client:
-                logger.info("Haiku filler: sending POST to %s ...", url)
-                resp = await client.post(
-                    url,
-                    headers={
-                        "Content-Type": "application/json",
-                        "x-api-key": anthropic_api_key,
-                        "anthropic-version": "2023-06-01",
-                    },
-                    json={
-                        "model": HAIKU_MODEL,
-                        "max_tokens": MAX_TOKENS,
-                        "messages": [
-                            {"role": "user", "content": _build_prompt(user_message)}
-                        ],
-                    },
-                    timeout=HARD_TIMEOUT_S,
-                )
-
-                elapsed_ms = (time.monotonic() - t0) * 1000
-                logger.info(
-                    "Haiku filler: Anthropic responded %d (%d bytes) in %.0fms",
-                    resp.status_code, len(resp.content), elapsed_ms,
-                )
-                if resp.status_code != 200:
-                    logger.warning(
-                        "Haiku filler: bad status %d — body: %s",
-                        resp.status_code, resp.text[:300],
-                    )
-                    return None
-
-                data = resp.json()
-
-                # Anthropic Messages API returns {"content": [{"type": "text", "text": "..."}]}
-                content_blocks = data.get("content", [])
-                if not content_blocks:
-                    logger.warning("Haiku filler: no content blocks in response: %s", data)
-                    return None
-
-                text = ""
-                for block in content_blocks:
-                    if block.get("type") == "text":
-                        text = block.get("text", "").strip()
-                        break
-
-                if text:
-                    logger.info("Haiku filler: generated phrase in %.0fms: %s", elapsed_ms, text)
-                else:
-                    logger.warning("Haiku filler: empty text in response: %s", data)
-                return text or None
+        client = _get_client()
+        logger.info("Haiku filler: sending POST to %s ...", url)
+        resp = await asyncio.wait_for(
+            client.post(
+                url,
+                headers={"x-api-key": anthropic_api_key},
+                json={
+                    **_STATIC_BODY,
+                    "messages": [
+                        {"role": "user", "content": _build_prompt(user_message)}
+                    ],
+                },
+                timeout=HARD_TIMEOUT_S,
+            ),
+            timeout=HARD_TIMEOUT_S,
+        )
+
+        elapsed_ms = (time.monotonic() - t0) * 1000
+        logger.info(
+            "Haiku filler: Anthropic responded %d (%d bytes) in %.0fms",
+            resp.status_code, len(resp.content), elapsed_ms,
+        )
+        if resp.status_code != 200:
+            logger.warning(
+                "Haiku filler: bad status %d — body: %s",
+                resp.status_code, resp.text[:300],
+            )
+            return None
+
+        data = resp.json()
+
+        # Anthropic Messages API returns {"content": [{"type": "text", "text": "..."}]}
+        content_blocks = data.get("content", [])
+        if not content_blocks:
+            logger.warning("Haiku filler: no content blocks in response: %s", data)
+            return None
+
+        text = ""
+        for block in content_blocks:
+            if block.get("type") == "text":
+                text = block.get("text", "").strip()
+                break
+
+        if text:
+            logger.info("Haiku filler: generated phrase in %.0fms: %s", elapsed_ms, text)
+        else:
+            logger.warning("Haiku filler: empty text in response: %s", data)
+        return text or None
 
     except (asyncio.TimeoutError, TimeoutError):
         elapsed_ms = (time.monotonic() - t0) * 1000
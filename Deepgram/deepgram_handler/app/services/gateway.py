@@ -1,8 +1,9 @@
 """OpenClaw gateway WebSocket RPC helper.
 
 The gateway exposes methods (sessions.list, agent, etc.) over a WebSocket
-protocol, not HTTP.  Each call opens a short-lived WebSocket connection,
-performs the JSON-RPC handshake, executes the request, and disconnects.
+protocol, not HTTP.  ``gateway_connection`` opens a WebSocket, performs the
+JSON-RPC handshake once, and then carries any number of requests until the
+block exits; ``call_gateway`` is the one-shot form for a single request.
 """
 
 from __future__ import annotations
@@ -11,124 +12,176 @@ import asyncio
 import json
 import logging
 import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 import websockets
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_GATEWAY_URL = "ws://localhost:18789"
+
+
+class GatewayError(Exception):
+    """The gateway rejected the connect handshake."""
+
+
+class GatewayConnection:
+    """An authenticated gateway socket shared by several RPCs.
+
+    A background reader hands each response to the request with the same
+    id and skips server events (connect.challenge, tick, ...).
+    """
+
+    def __init__(self, ws):
+        self._ws = ws
+        self._pending: dict[str, asyncio.Future] = {}
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                msg = json.loads(await self._ws.recv())
+                msg_type = msg.get("type")
+                if msg_type == "event":
+                    logger.debug("Gateway WS event: %s", msg.get("event"))
+                    continue
+                if msg_type != "res":
+                    continue
+                future = self._pending.pop(msg.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(msg)
+        except (websockets.ConnectionClosed, OSError, json.JSONDecodeError) as exc:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(exc)
+            self._pending.clear()
+
+    async def _request(self, method: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Send one request and return the raw ``res`` message for it."""
+        req_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = future
+        try:
+            await self._ws.send(
+                json.dumps({"type": "req", "id": req_id, "method": method, "params": params})
+            )
+            return await future
+        finally:
+            self._pending.pop(req_id, None)
+
+    async def _connect(self, gateway_token: str) -> None:
+        msg = await self._request(
+            "connect",
+            {
+                "minProtocol": 1,
+                "maxProtocol": 100,
+                "client": {
+                    "id": "gateway-client",
+                    "version": "1.0",
+                    "platform": "python",
+                    "mode": "backend",
+                },
+                "auth": {"token": gateway_token} if gateway_token else None,
+                "role": "operator",
+                "scopes": ["operator.write"],
+            },
+        )
+        if not msg.get("ok"):
+            error = msg.get("error", {})
+            raise GatewayError(error.get("message", "unknown"))
+        hello = msg.get("payload", {})
+        server = hello.get("server", {}) if isinstance(hello, dict) else {}
+        logger.info(
+            "Gateway connected (server=%s, connId=%s)",
+            server.get("version", "?"),
+            server.get("connId", "?"),
+        )
+
+    async def call(
+        self, method: str, params: dict[str, Any], timeout: float = 5.0
+    ) -> dict[str, Any] | None:
+        """Call *method* on this connection.
+
+        Returns the ``payload`` field from the response, or ``None`` on any error.
+        """
+        try:
+            logger.info(
+                "Gateway RPC %s — sending request (params=%s)",
+                method,
+                json.dumps(params, default=str)[:200],
+            )
+            async with asyncio.timeout(timeout):
+                msg = await self._request(method, params)
+            if not msg.get("ok"):
+                error = msg.get("error", {})
+                logger.warning(
+                    "Gateway RPC %s failed: %s",
+                    method,
+                    error.get("message", "unknown"),
+                )
+                return None
+            payload = msg.get("payload")
+            payload_preview = json.dumps(payload, default=str)[:200] if payload else "null"
+            logger.info("Gateway RPC %s — success (payload=%s)", method, payload_preview)
+            return payload
+        except Exception:
+            logger.warning("Gateway RPC %s failed", method, exc_info=True)
+            return None
+
+    async def aclose(self) -> None:
+        self._reader.cancel()
+        try:
+            await self._reader
+        except asyncio.CancelledError:
+            pass
+
+
+@asynccontextmanager
+async def gateway_connection(
+    gateway_url: str = DEFAULT_GATEWAY_URL,
+    gateway_token: str = "",
+    timeout: float = 5.0,
+) -> AsyncIterator[GatewayConnection]:
+    """Open a gateway WebSocket and complete the connect handshake.
+
+    *timeout* bounds the connect + handshake only; each ``call`` has its own.
+    Raises ``GatewayError`` if the gateway rejects the handshake.
+    """
+    logger.info("Gateway connecting to %s", gateway_url)
+    async with websockets.connect(gateway_url, open_timeout=timeout) as ws:
+        conn = GatewayConnection(ws)
+        try:
+            async with asyncio.timeout(timeout):
+                await conn._connect(gateway_token)
+            yield conn
+        finally:
+            await conn.aclose()
+
 
 async def call_gateway(
     method: str,
     params: dict[str, Any],
-    gateway_url: str = "ws://localhost:18789",
+    gateway_url: str = DEFAULT_GATEWAY_URL,
     gateway_token: str = "",
     timeout: float = 5.0,
 ) -> dict[str, Any] | None:
-    """Call an OpenClaw gateway RPC method via WebSocket.
+    """Call an OpenClaw gateway RPC method over its own WebSocket.
 
-    Opens a WebSocket, performs the connect handshake with token auth,
-    sends the request, waits for the response, and closes.
+    Opens a connection, performs the connect handshake with token auth,
+    sends the request, waits for the response, and closes.  Use
+    ``gateway_connection`` directly to send several requests on one socket.
 
     Returns the ``payload`` field from the response, or ``None`` on any error.
     """
     try:
-        logger.info("Gateway RPC %s — connecting to %s", method, gateway_url)
         async with asyncio.timeout(timeout):
-            async with websockets.connect(gateway_url) as ws:
-                # --- connect handshake ---
-                connect_id = str(uuid.uuid4())
-                await ws.send(
-                    json.dumps(
-                        {
-                            "type": "req",
-                            "id": connect_id,
-                            "method": "connect",
-                            "params": {
-                                "minProtocol": 1,
-                                "maxProtocol": 100,
-                                "client": {
-                                    "id": "gateway-client",
-                                    "version": "1.0",
-                                    "platform": "python",
-                                    "mode": "backend",
-                                },
-                                "auth": (
-                                    {"token": gateway_token}
-                                    if gateway_token
-                                    else None
-                                ),
-                                "role": "operator",
-                                "scopes": ["operator.write"],
-                            },
-                        }
-                    )
-                )
-
-                # Wait for hello-ok response (skip events like connect.challenge)
-                while True:
-                    raw = await ws.recv()
-                    msg = json.loads(raw)
-                    if msg.get("type") == "event":
-                        logger.debug("Gateway WS event during handshake: %s", msg.get("event"))
-                        continue
-                    if msg.get("type") == "res" and msg.get("id") == connect_id:
-                        if not msg.get("ok"):
-                            error = msg.get("error", {})
-                            logger.warning(
-                                "Gateway connect failed: %s",
-                                error.get("message", "unknown"),
-                            )
-                            return None
-                        hello = msg.get("payload", {})
-                        server = hello.get("server", {}) if isinstance(hello, dict) else {}
-                        logger.info(
-                            "Gateway RPC %s — connected (server=%s, connId=%s)",
-                            method,
-                            server.get("version", "?"),
-                            server.get("connId", "?"),
-                        )
-                        break
-
-                # --- method request ---
-                req_id = str(uuid.uuid4())
-                logger.info(
-                    "Gateway RPC %s — sending request (params=%s)",
-                    method,
-                    json.dumps(params, default=str)[:200],
-                )
-                await ws.send(
-                    json.dumps(
-                        {
-                            "type": "req",
-                            "id": req_id,
-                            "method": method,
-                            "params": params,
-                        }
-                    )
-                )
-
-                # Wait for method response (skip events)
-                while True:
-                    raw = await ws.recv()
-                    msg = json.loads(raw)
-                    if msg.get("type") == "event":
-                        logger.debug("Gateway WS event during RPC: %s", msg.get("event"))
-                        continue
-                    if msg.get("type") == "res" and msg.get("id") == req_id:
-                        if not msg.get("ok"):
-                            error = msg.get("error", {})
-                            logger.warning(
-                                "Gateway RPC %s failed: %s",
-                                method,
-                                error.get("message", "unknown"),
-                            )
-                            return None
-                        payload = msg.get("payload")
-                        payload_preview = json.dumps(payload, default=str)[:200] if payload else "null"
-                        logger.info("Gateway RPC %s — success (payload=%s)", method, payload_preview)
-                        return payload
-
+            async with gateway_connection(gateway_url, gateway_token, timeout) as conn:
+                return await conn.call(method, params, timeout)
+    except GatewayError as exc:
+        logger.warning("Gateway connect failed: %s", exc)
+        return None
     except Exception:
         logger.warning("Gateway RPC %s failed", method, exc_info=True)
         return None
@@ -1,6 +1,7 @@
 """MMS media helpers: extract Twilio media attachments and build OpenAI-compatible content."""
 
-import base64
+import asyncio
+import binascii
 import logging
 
 import httpx
@@ -8,6 +9,53 @@ from starlette.datastructures import FormData
 
 logger = logging.getLogger(__name__)
 
+_DOWNLOAD_CHUNK = 64 * 1024
+
+# Twilio attaches at most 10 media items per message.
+_MEDIA_KEYS: tuple[tuple[str, str], ...] = tuple(
+    (f"MediaUrl{i}", f"MediaContentType{i}") for i in range(10)
+)
+
+_DATA_URL_PREFIXES: dict[str, bytes] = {
+    media_type: f"data:{media_type};base64,".encode("ascii")
+    for media_type in ("image/jpeg", "image/png", "image/gif", "image/webp")
+}
+
+
+async def _download_data_url(client: httpx.AsyncClient, url: str, media_type: str) -> str:
+    """Stream *url* into a base64 ``data:`` URL as the chunks arrive.
+
+    Encodes 3-byte-aligned slices so the raw image is never held in full
+    alongside its encoding; the prefix and slices are joined once at the end.
+    """
+    prefix = _DATA_URL_PREFIXES.get(media_type)
+    if prefix is None:
+        prefix = f"data:{media_type};base64,".encode("ascii")
+    encoded: list[bytes] = [prefix]
+    carry = b""
+    async with client.stream("GET", url) as resp:
+        resp.raise_for_status()
+        async for chunk in resp.aiter_bytes(_DOWNLOAD_CHUNK):
+            if carry:
+                chunk = carry + chunk
+            cut = len(chunk) - len(chunk) % 3
+            encoded.append(binascii.b2a_base64(memoryview(chunk)[:cut], newline=False))
+            carry = chunk[cut:]
+    if carry:
+        encoded.append(binascii.b2a_base64(carry, newline=False))
+    return b"".join(encoded).decode("ascii")
+
+
+async def _try_download_data_url(
+    client: httpx.AsyncClient, url: str, media_type: str
+) -> str | None:
+    """Return *url* as a data URL, or None if the download fails."""
+    try:
+        return await _download_data_url(client, url, media_type)
+    except Exception:
+        logger.exception("Failed to download media from %s", url)
+        return None
+
 
 async def build_message_content(form: FormData) -> str | list:
     """Build OpenAI chat message content from Twilio SMS/MMS form data.
@@ -25,25 +73,29 @@ async def build_message_content(form: FormData) -> str | list:
     if body:
         parts.append({"type": "text", "text": body})
 
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        for i in range(num_media):
-            media_url = form.get(f"MediaUrl{i}", "")
-            media_type = form.get(f"MediaContentType{i}", "")
-            if not media_url:
-                continue
-
-            if media_type.startswith("image/"):
-                try:
-                    resp = await client.get(media_url)
-                    resp.raise_for_status()
-                    b64 = base64.b64encode(resp.content).decode("ascii")
-                    data_uri = f"data:{media_type};base64,{b64}"
-                    parts.append({"type": "image_url", "image_url": {"url": data_uri}})
-                except Exception:
-                    logger.exception("Failed to download media from %s", media_url)
-                    parts.append({"type": "text", "text": f"[Failed to load image: {media_type}]"})
-            else:
-                parts.append({"type": "text", "text": f"[Unsupported media type: {media_type}]"})
+    media: list[tuple[str, str]] = []
+    for url_key, type_key in _MEDIA_KEYS[:max(num_media, 0)]:
+        media_url = form.get(url_key, "")
+        if media_url:
+            media.append((media_url, form.get(type_key, "")))
+
+    # Only set up a client when there is an image to fetch; fetch them all at once.
+    images = [(url, media_type) for url, media_type in media if media_type.startswith("image/")]
+    downloads: list[str | None] = []
+    if images:
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            downloads = await asyncio.gather(
+                *(_try_download_data_url(client, url, media_type) for url, media_type in images)
+            )
+
+    downloaded = iter(downloads)
+    for media_url, media_type in media:
+        if not media_type.startswith("image/"):
+            parts.append({"type": "text", "text": f"[Unsupported media type: {media_type}]"})
+        elif (data_uri := next(downloaded)) is None:
+            parts.append({"type": "text", "text": f"[Failed to load image: {media_type}]"})
+        else:
+            parts.append({"type": "image_url", "image_url": {"url": data_uri}})
 
     if not parts:
         return body if body else "[Empty message]"
@@ -72,13 +72,13 @@ class SessionTimers:
         if reengage_ms > 0:
             self._response_reengage_handle = loop.call_later(
                 reengage_ms / 1000,
-                lambda: asyncio.ensure_future(self._fire_response_reengage()),
+                lambda: loop.create_task(self._fire_response_reengage()),
             )
 
         if exit_ms > 0:
             self._response_exit_handle = loop.call_later(
                 exit_ms / 1000,
-                lambda: asyncio.ensure_future(self._fire_response_exit()),
+                lambda: loop.create_task(self._fire_response_exit()),
             )
 
         self._cb.log(
@@ -124,7 +124,7 @@ class SessionTimers:
             loop = asyncio.get_running_loop()
             self._idle_prompt_handle = loop.call_later(
                 prompt_ms / 1000,
-                lambda: asyncio.ensure_future(self._fire_idle_prompt()),
+                lambda: loop.create_task(self._fire_idle_prompt()),
             )
             self._cb.log(
                 f"[SessionTimers] on_agent_audio_done — idle timer started (prompt={prompt_ms}ms)"
@@ -172,7 +172,7 @@ class SessionTimers:
             loop = asyncio.get_running_loop()
             self._idle_exit_handle = loop.call_later(
                 exit_ms / 1000,
-                lambda: asyncio.ensure_future(self._fire_idle_exit()),
+                lambda: loop.create_task(self._fire_idle_exit()),
             )
 
     async def _fire_idle_exit(self) -> None:
@@ -6,10 +6,11 @@ Extracts structured data from the markdown templates used by OpenClaw agents.
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass, fields
+from collections import deque
+from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class UserProfile:
     """Structured user data extracted from USER.md."""
 
@@ -23,6 +24,9 @@ class UserProfile:
 
 # Patterns that indicate a field is still a placeholder (not filled in).
 _PLACEHOLDER_RE = re.compile(r"^_?\(?.*?\)?_?$")
+_WRAPPED_PLACEHOLDER_RE = re.compile(r"^_\(.*\)_$")
+# Deletes bold/italic markers from field labels.
+_MD_TRANS = str.maketrans("", "", "*_")
 _KNOWN_PLACEHOLDERS = {
     "optional",
     "what do they care about? what projects are they working on? what annoys them? what makes them laugh? build this over time.",
@@ -38,23 +42,41 @@ _FIELD_MAP: dict[str, str] = {
 }
 
 
+def may_be_placeholder(value: str, initials: frozenset[str]) -> bool:
+    """Return False if *value*'s first non-markup char starts no placeholder."""
+    for ch in value:
+        if ch.isspace() or ch in "*_(":
+            continue
+        return ch.lower()[:1] in initials
+    return True
+
+
 def _is_placeholder(value: str) -> bool:
     """Return True if *value* is an unfilled placeholder."""
     value = value.strip()
     if not value:
         return True
     # Strip outer markdown formatting
-    normalized = re.sub(r"^[*_]+|[*_]+$", "", value).strip()
+    normalized = value.strip("*_").strip()
     if normalized.startswith("(") and normalized.endswith(")"):
         normalized = normalized[1:-1].strip()
     if normalized.lower() in _KNOWN_PLACEHOLDERS:
         return True
     # Match pattern like _(optional)_ or _(pick something you like)_
-    if re.match(r"^_\(.*\)_$", value):
+    if _WRAPPED_PLACEHOLDER_RE.match(value):
         return True
     return False
 
 
+def _is_context_heading(stripped: str) -> bool:
+    """Return True for a ``## Context`` heading (any case, any spacing)."""
+    return (
+        stripped[:2] == "##"
+        and stripped[2:3].isspace()
+        and stripped[3:].lstrip()[:7].lower() == "context"
+    )
+
+
 def parse_user_markdown(content: str) -> UserProfile:
     """Parse ``USER.md`` content into a :class:`UserProfile`.
 
@@ -63,50 +85,53 @@ def parse_user_markdown(content: str) -> UserProfile:
     (e.g. ``**Name:**``).
     """
     profile = UserProfile()
-    lines = content.split("\n")
-
-    # Find context section
-    context_start = -1
-    for i, line in enumerate(lines):
-        if re.match(r"^##\s+context", line.strip(), re.IGNORECASE):
-            context_start = i + 1
-            break
-
-    # Parse key-value lines before context section
-    kv_end = context_start - 1 if context_start != -1 else len(lines)
-    for i in range(kv_end):
-        cleaned = lines[i].strip().lstrip("- ")
+    in_context = False
+    ctx_lines: list[str] = []
+
+    for line in content.splitlines():
+        stripped = line.strip()
+        if in_context:
+            # Context runs until a horizontal rule or top-level heading
+            if line.rstrip() == "---" or (line[:1] == "#" and line[1:2].isspace()):
+                break
+            ctx_lines.append(line)
+            continue
+        if _is_context_heading(stripped):
+            in_context = True
+            continue
+
+        cleaned = stripped.lstrip("- ")
         colon_idx = cleaned.find(":")
         if colon_idx == -1:
             continue
         # Strip bold/italic markers from the label
-        label = re.sub(r"[*_]", "", cleaned[:colon_idx]).strip().lower()
+        label = cleaned[:colon_idx].translate(_MD_TRANS).strip().lower()
         # Strip trailing bold/italic markers from the value
-        value = re.sub(r"^[*_]+|[*_]+$", "", cleaned[colon_idx + 1 :]).strip()
+        value = cleaned[colon_idx + 1 :].strip("*_").strip()
         if not value or _is_placeholder(value):
             continue
         attr = _FIELD_MAP.get(label)
         if attr:
             setattr(profile, attr, value)
 
-    # Extract ## Context section (everything after heading until --- or next heading)
-    if context_start != -1:
-        ctx_lines = []
-        for i in range(context_start, len(lines)):
-            line = lines[i]
-            if re.match(r"^---\s*$", line) or re.match(r"^#\s", line):
-                break
-            ctx_lines.append(line)
-        ctx = "\n".join(ctx_lines).strip()
-        if ctx and not _is_placeholder(ctx):
-            profile.context = ctx
+    # Context is everything after the heading until --- or the next heading
+    ctx = "\n".join(ctx_lines).strip()
+    if ctx and not _is_placeholder(ctx):
+        profile.context = ctx
 
     return profile
 
 
 def has_values(profile: UserProfile) -> bool:
     """Return ``True`` if any field in *profile* is non-empty."""
-    return any(getattr(profile, f.name) for f in fields(profile))
+    return bool(
+        profile.name
+        or profile.call_name
+        or profile.pronouns
+        or profile.timezone
+        or profile.notes
+        or profile.context
+    )
 
 
 def parse_calls_md(content: str, count: int = 3) -> list[str]:
@@ -118,23 +143,27 @@ def parse_calls_md(content: str, count: int = 3) -> list[str]:
     if not content or not content.strip():
         return []
 
-    # Split on ### headings, keeping the heading text
+    # Only the last *count* entries are kept while scanning.  count <= 0
+    # keeps them all and is sliced below, as ``entries[-count:]`` always was.
+    recent: deque[tuple[str, list[str]]] = deque(maxlen=count if count > 0 else None)
+    current: tuple[str, list[str]] | None = None
+    for line in content.splitlines():
+        if line.startswith("### "):
+            if current is not None:
+                recent.append(current)
+            current = (line.strip(), [])
+        elif current is not None:
+            current[1].append(line)
+    if current is not None:
+        recent.append(current)
+
     entries: list[str] = []
-    for block in re.split(r"(?=^### )", content, flags=re.MULTILINE):
-        block = block.strip()
-        if not block.startswith("### "):
-            continue
-        # Extract heading and body
-        lines = block.split("\n", 1)
-        heading = lines[0].strip()
-        body = lines[1].strip() if len(lines) > 1 else ""
+    for heading, body_lines in recent:
+        body = "\n".join(body_lines).strip()
         if body and len(body) > 150:
             body = body[:147] + "..."
-        summary = f"{heading}\n{body}" if body else heading
-        entries.append(summary)
-
-    # Return last N
-    return entries[-count:] if entries else []
+        entries.append(f"{heading}\n{body}" if body else heading)
+    return entries if count > 0 else entries[-count:]
 
 
 def is_blank_identity(content: str) -> bool:
@@ -146,22 +175,22 @@ def is_blank_identity(content: str) -> bool:
     if not content or not content.strip():
         return True
 
-    lines = content.split("\n")
-    for i, line in enumerate(lines):
+    lines = iter(content.splitlines())
+    for line in lines:
         cleaned = line.strip().lstrip("- ")
         colon_idx = cleaned.find(":")
         if colon_idx == -1:
             continue
-        label = re.sub(r"[*_]", "", cleaned[:colon_idx]).strip().lower()
+        label = cleaned[:colon_idx].translate(_MD_TRANS).strip().lower()
         if label != "name":
             continue
         # Found the Name field
-        value = re.sub(r"^[*_]+|[*_]+$", "", cleaned[colon_idx + 1 :]).strip()
+        value = cleaned[colon_idx + 1 :].strip("*_").strip()
         if value and not _is_placeholder(value):
             return False
         # Value is empty — check indented next line for placeholder
-        if not value and i + 1 < len(lines):
-            next_val = lines[i + 1].strip()
+        if not value:
+            next_val = next(lines, "").strip()
             if next_val and not _is_placeholder(next_val):
                 return False
         return True
@@ -10,7 +10,9 @@ from __future__ import annotations
 import logging
 import re
 from dataclasses import dataclass
+from pathlib import Path
 
+from app.services.user_md_parser import may_be_placeholder
 from app.services.workspace import (
     CallInfo,
     call_anthropic,
@@ -28,13 +30,22 @@ USER_PLACEHOLDERS = {
     "what do they care about? what projects are they working on? what annoys them? what makes them laugh? build this over time.",
 }
 
+_MD_TRANS = str.maketrans("", "", "*_")
+_WS_RE = re.compile(r"\s+")
+_PLACEHOLDER_INITIALS = frozenset(p[0] for p in USER_PLACEHOLDERS)
+
+# USER.md path -> st_mtime_ns at which it was last seen fully populated.
+# Lets later calls skip the read + parse until the file changes.
+_populated_mtimes: dict[Path, int] = {}
+
 PROFILE_SYSTEM_PROMPT = (
     "Extract user profile information from this phone call transcript. "
     "Return ONLY a JSON object with the fields you can confidently extract. "
     "Do NOT guess or infer values not in the conversation. Return valid JSON only."
 )
 
-PROFILE_PROMPT_TEMPLATE = (
+# The transcript is appended directly after this prefix.
+PROFILE_PROMPT_PREFIX = (
     "Extract user profile information from this phone call transcript.\n"
     "Return ONLY a JSON object with fields you can confidently extract from the conversation.\n\n"
     "Fields:\n"
@@ -47,11 +58,11 @@ PROFILE_PROMPT_TEMPLATE = (
     "Only include fields supported by clear evidence in the transcript.\n"
     "Do NOT guess or infer values not in the conversation.\n"
     "Return valid JSON only, no markdown.\n\n"
-    "Transcript:\n{transcript}"
+    "Transcript:\n"
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class UserProfile:
     name: str | None = None
     call_name: str | None = None
@@ -64,17 +75,19 @@ class UserProfile:
 def normalize_value(value: str) -> str:
     """Normalize a value for placeholder comparison."""
     n = value.strip()
-    n = re.sub(r"^[*_]+|[*_]+$", "", n).strip()
+    n = n.strip("*_").strip()
     if n.startswith("(") and n.endswith(")"):
         n = n[1:-1].strip()
     n = n.replace("\u2013", "-").replace("\u2014", "-")
-    n = re.sub(r"\s+", " ", n).lower()
+    n = _WS_RE.sub(" ", n).lower()
     return n
 
 
 def is_placeholder(value: str) -> bool:
     """Check if a value is a known placeholder."""
-    return normalize_value(value) in USER_PLACEHOLDERS
+    return may_be_placeholder(value, _PLACEHOLDER_INITIALS) and (
+        normalize_value(value) in USER_PLACEHOLDERS
+    )
 
 
 def _strip_frontmatter(content: str) -> str:
@@ -86,28 +99,40 @@ def _strip_frontmatter(content: str) -> str:
     return content
 
 
+def _is_context_heading(stripped: str) -> bool:
+    """Return True for a ``## Context`` heading (any case, any spacing)."""
+    return (
+        stripped[:2] == "##"
+        and stripped[2:3].isspace()
+        and stripped[3:].lstrip()[:7].lower() == "context"
+    )
+
+
 def parse_user_md(content: str) -> UserProfile:
     """Parse USER.md markdown into a UserProfile."""
     content = _strip_frontmatter(content)
     profile = UserProfile()
-    lines = content.split("\n")
-
-    # Find context section
-    context_start = -1
-    for i, line in enumerate(lines):
-        if re.match(r"^##\s+context", line.strip(), re.IGNORECASE):
-            context_start = i + 1
-            break
-
-    # Parse key-value lines before context section
-    kv_end = context_start - 1 if context_start != -1 else len(lines)
-    for i in range(kv_end):
-        cleaned = lines[i].strip().lstrip("- ")
+    in_context = False
+    ctx_lines: list[str] = []
+
+    for line in content.splitlines():
+        stripped = line.strip()
+        if in_context:
+            if line.rstrip() == "---" or (line[:1] == "#" and line[1:2].isspace()):
+                break
+            ctx_lines.append(line)
+            continue
+        if _is_context_heading(stripped):
+            in_context = True
+            continue
+
+        # Key-value lines before the context section
+        cleaned = stripped.lstrip("- ")
         colon_idx = cleaned.find(":")
         if colon_idx == -1:
             continue
-        label = re.sub(r"[*_]", "", cleaned[:colon_idx]).strip().lower()
-        value = re.sub(r"^[*_]+|[*_]+$", "", cleaned[colon_idx + 1 :]).strip()
+        label = cleaned[:colon_idx].translate(_MD_TRANS).strip().lower()
+        value = cleaned[colon_idx + 1 :].strip("*_").strip()
         if not value or is_placeholder(value):
             continue
         if label == "name":
@@ -121,17 +146,9 @@ def parse_user_md(content: str) -> UserProfile:
         elif label == "notes":
             profile.notes = value
 
-    # Parse context section
-    if context_start != -1:
-        ctx_lines = []
-        for i in range(context_start, len(lines)):
-            line = lines[i]
-            if re.match(r"^---\s*$", line) or re.match(r"^#\s", line):
-                break
-            ctx_lines.append(line)
-        ctx = "\n".join(ctx_lines).strip()
-        if ctx and not is_placeholder(ctx):
-            profile.context = ctx
+    ctx = "\n".join(ctx_lines).strip()
+    if ctx and not is_placeholder(ctx):
+        profile.context = ctx
 
     return profile
 
@@ -149,55 +166,43 @@ def _profile_is_populated(profile: UserProfile) -> bool:
 
 def merge_user_profiles(existing: UserProfile, extracted: UserProfile) -> UserProfile:
     """Merge extracted profile into existing with fill-only semantics."""
-    merged = UserProfile(
-        name=existing.name,
-        call_name=existing.call_name,
-        pronouns=existing.pronouns,
-        timezone=existing.timezone,
-        notes=existing.notes,
-        context=existing.context,
-    )
-    if not merged.name and extracted.name:
-        merged.name = extracted.name
-    if not merged.call_name and extracted.call_name:
-        merged.call_name = extracted.call_name
-    if not merged.pronouns and extracted.pronouns:
-        merged.pronouns = extracted.pronouns
-    if not merged.timezone and extracted.timezone:
-        merged.timezone = extracted.timezone
-    if not merged.notes and extracted.notes:
-        merged.notes = extracted.notes
+    context = existing.context
     if extracted.context:
-        if not merged.context:
-            merged.context = extracted.context
-        elif extracted.context not in merged.context:
-            merged.context = merged.context.rstrip() + "\n" + extracted.context
-    return merged
+        if not context:
+            context = extracted.context
+        elif extracted.context not in context:
+            context = context.rstrip() + "\n" + extracted.context
+    return UserProfile(
+        name=existing.name or extracted.name,
+        call_name=existing.call_name or extracted.call_name,
+        pronouns=existing.pronouns or extracted.pronouns,
+        timezone=existing.timezone or extracted.timezone,
+        notes=existing.notes or extracted.notes,
+        context=context,
+    )
 
 
 def serialize_user_md(profile: UserProfile) -> str:
     """Serialize a UserProfile back to USER.md markdown."""
-    lines = [
-        "# USER.md - About Your Human",
-        "",
-        "_Learn about the person you're helping. Update this as you go._",
-        "",
-        f"- **Name:** {profile.name or ''}",
-        f"- **What to call them:** {profile.call_name or ''}",
-        f"- **Pronouns:** {profile.pronouns or '_(optional)_'}",
-        f"- **Timezone:** {profile.timezone or ''}",
-        f"- **Notes:** {profile.notes or ''}",
-        "",
-        "## Context",
-        "",
-        profile.context or "",
-        "",
-        "---",
-        "",
-        "The more you know, the better you can help. But remember \u2014 you're learning about a person, not building a dossier. Respect the difference.",
-        "",
-    ]
-    return "\n".join(lines)
+    return (
+        "# USER.md - About Your Human\n"
+        "\n"
+        "_Learn about the person you're helping. Update this as you go._\n"
+        "\n"
+        f"- **Name:** {profile.name or ''}\n"
+        f"- **What to call them:** {profile.call_name or ''}\n"
+        f"- **Pronouns:** {profile.pronouns or '_(optional)_'}\n"
+        f"- **Timezone:** {profile.timezone or ''}\n"
+        f"- **Notes:** {profile.notes or ''}\n"
+        "\n"
+        "## Context\n"
+        "\n"
+        f"{profile.context or ''}\n"
+        "\n"
+        "---\n"
+        "\n"
+        "The more you know, the better you can help. But remember \u2014 you're learning about a person, not building a dossier. Respect the difference.\n"
+    )
 
 
 async def extract_user_profile(settings, call_info: CallInfo) -> None:
@@ -208,18 +213,30 @@ async def extract_user_profile(settings, call_info: CallInfo) -> None:
             return
 
         user_path = workspace_path(settings, "USER.md")
+        try:
+            mtime_ns = user_path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None and _populated_mtimes.get(user_path) == mtime_ns:
+            logger.info(
+                "[post-call] Skipping user profile extraction: all fields populated"
+            )
+            return
+
         existing_content = read_workspace_file(user_path)
         existing_profile = (
             parse_user_md(existing_content) if existing_content else UserProfile()
         )
 
         if _profile_is_populated(existing_profile):
+            if mtime_ns is not None:
+                _populated_mtimes[user_path] = mtime_ns
             logger.info(
                 "[post-call] Skipping user profile extraction: all fields populated"
             )
             return
 
-        prompt = PROFILE_PROMPT_TEMPLATE.format(transcript=transcript_text)
+        prompt = PROFILE_PROMPT_PREFIX + transcript_text
         raw = await call_anthropic(
             settings.OPENCLAW_GATEWAY_TOKEN,
             prompt,
@@ -10,6 +10,7 @@ import json
 import logging
 import re
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 import httpx
@@ -22,15 +23,21 @@ GATEWAY_URL = "http://localhost:18789/v1/chat/completions"
 TIMEOUT_S = 30.0
 MAX_TOKENS = 1024
 
+_CODE_FENCE_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)```")
 
-@dataclass
+# Shared client so repeat post-call extractions reuse pooled connections
+# to the gateway instead of reconnecting on every call.
+_client: httpx.AsyncClient | None = None
+
+
+@dataclass(slots=True)
 class TranscriptEntry:
     timestamp: float
     speaker: str  # "bot" | "user"
     text: str
 
 
-@dataclass
+@dataclass(slots=True)
 class CallInfo:
     call_id: str
     phone_number: str
@@ -39,30 +46,40 @@ class CallInfo:
     transcript: list[TranscriptEntry]
 
 
+_SPEAKER_LABELS = {"bot": "Agent: ", "user": "Caller: "}
+
+
 def format_transcript(transcript: list[TranscriptEntry]) -> str:
     """Format transcript entries as 'Agent: .../Caller: ...' dialogue."""
-    lines = []
-    for entry in transcript:
-        label = "Agent" if entry.speaker == "bot" else "Caller"
-        lines.append(f"{label}: {entry.text}")
-    return "\n".join(lines)
+    return "\n".join(
+        _SPEAKER_LABELS.get(entry.speaker, "Caller: ") + entry.text
+        for entry in transcript
+    )
+
+
+@lru_cache(maxsize=16)
+def _resolve_path(base: Path, agent_id: str, filename: str) -> Path:
+    if agent_id != "main":
+        base = base / agent_id
+    return base / filename
 
 
 def workspace_path(settings, filename: str) -> Path:
     """Resolve a workspace file path for the configured agent."""
-    base = WORKSPACE_DIR
-    if settings.OPENCLAW_AGENT_ID != "main":
-        base = base / settings.OPENCLAW_AGENT_ID
-    return base / filename
+    return _resolve_path(WORKSPACE_DIR, settings.OPENCLAW_AGENT_ID, filename)
 
 
 def read_workspace_file(path: Path) -> str | None:
     """Read a workspace file. Returns None if missing or empty."""
     try:
-        content = path.read_text().strip()
-        return content or None
+        content = path.read_text()
     except (FileNotFoundError, PermissionError):
         return None
+    # isspace() checks blank files without building a stripped copy;
+    # strip() returns the same object when there is nothing to trim.
+    if not content or content.isspace():
+        return None
+    return content.strip()
 
 
 def write_workspace_file(path: Path, content: str) -> None:
@@ -76,7 +93,7 @@ def parse_json_response(raw: str) -> dict | None:
     if not raw or not raw.strip():
         return None
     text = raw.strip()
-    fence_match = re.search(r"```(?:json)?\s*([\s\S]*?)```", text)
+    fence_match = _CODE_FENCE_RE.search(text)
     if fence_match:
         text = fence_match.group(1).strip()
     try:
@@ -86,6 +103,25 @@ def parse_json_response(raw: str) -> dict | None:
         return None
 
 
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared gateway client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=TIMEOUT_S,
+            limits=httpx.Limits(max_keepalive_connections=4),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared gateway client (called on app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 async def call_anthropic(
     gateway_token: str,
     prompt: str,
@@ -103,36 +139,36 @@ async def call_anthropic(
         return None
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                GATEWAY_URL,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {gateway_token}",
-                },
-                json={
-                    "model": SONNET_MODEL,
-                    "max_tokens": max_tokens,
-                    "stream": False,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt},
-                    ],
-                },
-                timeout=TIMEOUT_S,
-            )
-
-            if resp.status_code != 200:
-                logger.warning("Gateway API returned %d", resp.status_code)
-                return None
-
-            data = resp.json()
-            choices = data.get("choices", [])
-            if not choices:
-                return None
-
-            text = choices[0].get("message", {}).get("content", "").strip()
-            return text or None
+        client = _get_client()
+        resp = await client.post(
+            GATEWAY_URL,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {gateway_token}",
+            },
+            json={
+                "model": SONNET_MODEL,
+                "max_tokens": max_tokens,
+                "stream": False,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt},
+                ],
+            },
+            timeout=TIMEOUT_S,
+        )
+
+        if resp.status_code != 200:
+            logger.warning("Gateway API returned %d", resp.status_code)
+            return None
+
+        data = resp.json()
+        choices = data.get("choices", [])
+        if not choices:
+            return None
+
+        text = choices[0].get("message", {}).get("content", "").strip()
+        return text or None
 
     except Exception:
         logger.debug("Gateway API call failed", exc_info=True)
@@ -1,4 +1,11 @@
 import os
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
 
 # Set required env vars for tests
 os.environ.setdefault("DEEPGRAM_API_KEY", "test-key")
@@ -8,3 +15,99 @@ os.environ.setdefault("ANTHROPIC_API_KEY", "test-anthropic-key")
 os.environ.setdefault("TIMEZONE", "UTC")
 os.environ.setdefault("CALLS_MAX_ENTRIES", "50")
 os.environ.setdefault("POST_CALL_EXTRACTION", "true")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """One TestClient (and app lifespan) shared by every HTTP test."""
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest_asyncio.fixture(scope="session")
+async def ac():
+    """In-process ASGI client shared by the async HTTP tests."""
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def base_settings():
+    """Validated Settings built once; derive variants with ``model_copy``."""
+    from app.config import Settings
+
+    return Settings(
+        DEEPGRAM_API_KEY="test-key",
+        OPENCLAW_GATEWAY_TOKEN="gw-token",
+        ANTHROPIC_API_KEY="test-anthropic-key",
+        _env_file=None,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _sandbox_agent_paths(tmp_path, monkeypatch):
+    """Keep every test away from the real NEXT_GREETING.txt and USER.md."""
+    monkeypatch.setattr(
+        "app.services.deepgram_agent.NEXT_GREETING_PATH", tmp_path / "NEXT_GREETING.txt"
+    )
+    monkeypatch.setattr("app.services.deepgram_agent.USER_MD_PATH", tmp_path / "USER.md")
+    return tmp_path
+
+
+@pytest.fixture
+def mock_httpx_client(monkeypatch):
+    """Replace an ``httpx.AsyncClient`` constructor with a pre-wired stand-in.
+
+    Call ``install(response=..., exc=..., target="<module>.httpx.AsyncClient")``;
+    ``get``, ``post`` and ``stream`` all return *response* (or raise *exc*),
+    and the ``post`` mock is returned so tests can inspect the request.
+    """
+
+    def install(response=None, exc=None, *, target: str) -> AsyncMock:
+        client = AsyncMock()
+        client.__aenter__.return_value = client
+        client.__aexit__.return_value = False
+        client.get = AsyncMock(return_value=response, side_effect=exc)
+        client.post = AsyncMock(return_value=response, side_effect=exc)
+        client.stream = MagicMock(return_value=response, side_effect=exc)
+        monkeypatch.setattr(target, lambda *args, **kwargs: client)
+        return client.post
+
+    return install
+
+
+@pytest.fixture
+def workspace_dir(tmp_path, monkeypatch):
+    """Point the agent workspace at a per-test temp directory."""
+    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def workspace_fs(monkeypatch):
+    """In-memory workspace for the post-call extractors, keyed by path.
+
+    Replaces read/write_workspace_file in the modules under test so no
+    file is touched; WORKSPACE_DIR points at a path that never exists.
+    """
+    files: dict[Path, str] = {}
+
+    def read(path: Path) -> str | None:
+        content = files.get(path)
+        if not content or content.isspace():
+            return None
+        return content.strip()
+
+    def write(path: Path, content: str) -> None:
+        files[path] = content
+
+    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", Path("/nonexistent-workspace"))
+    for module in ("app.services.agent_identity", "app.services.call_summary"):
+        monkeypatch.setattr(f"{module}.read_workspace_file", read)
+        monkeypatch.setattr(f"{module}.write_workspace_file", write)
+    return files
@@ -0,0 +1,120 @@
+"""Lightweight stand-ins for the sockets and HTTP responses used in tests."""
+
+from fastapi import WebSocketDisconnect
+
+
+class FakeDeepgramWS:
+    """Deepgram agent socket that yields scripted frames and records sends.
+
+    Iteration yields *messages* (none by default), then raises *error* if
+    given instead of ending cleanly.
+    """
+
+    def __init__(self, messages=(), error: BaseException | None = None):
+        self.sent: list = []
+        self.closed = False
+        self._messages = iter(messages)
+        self._error = error
+
+    async def send(self, message) -> None:
+        self.sent.append(message)
+
+    async def close(self) -> None:
+        self.closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._messages)
+        except StopIteration:
+            pass
+        if self._error is not None:
+            raise self._error
+        raise StopAsyncIteration
+
+
+class FakeTwilioWS:
+    """Twilio media socket whose caller has already hung up."""
+
+    def __init__(self):
+        self.sent: list[str] = []
+
+    async def receive_text(self) -> str:
+        raise WebSocketDisconnect()
+
+    async def send_text(self, message: str) -> None:
+        self.sent.append(message)
+
+
+def connect_returning(ws):
+    """Return a stand-in for ``websockets.connect`` that yields *ws*."""
+
+    async def fake_connect(*args, **kwargs):
+        return ws
+
+    return fake_connect
+
+
+class FakeResp:
+    """Minimal successful httpx response: only status, text and json()."""
+
+    status_code = 200
+
+    def __init__(self, payload: dict):
+        self._payload = payload
+        self.text = str(payload)
+
+    def json(self) -> dict:
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class FakeStreamResp:
+    """Streamed httpx response, as returned by ``client.stream(...)``.
+
+    Yields *content* in *chunk_size* pieces so callers see several chunks.
+    """
+
+    status_code = 200
+
+    def __init__(self, content: bytes, chunk_size: int = 4):
+        self._content = content
+        self._chunk_size = chunk_size
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+    def raise_for_status(self) -> None:
+        pass
+
+    async def aiter_bytes(self, chunk_size: int | None = None):
+        for i in range(0, len(self._content), self._chunk_size):
+            yield self._content[i : i + self._chunk_size]
+
+
+class FakeUpstreamResp:
+    """Gateway response sent back through the OpenClaw proxy.
+
+    Streams *chunks* from ``aiter_bytes`` and records ``aclose``.
+    """
+
+    status_code = 200
+
+    def __init__(self, *chunks: bytes, content_type: str = "text/event-stream"):
+        self.headers = {"content-type": content_type}
+        self.closed = False
+        self._chunks = chunks
+
+    async def aiter_bytes(self):
+        for chunk in self._chunks:
+            yield chunk
+
+    async def aclose(self) -> None:
+        self.closed = True
@@ -1,15 +1,35 @@
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock
 
 import httpx
 import pytest
-from fastapi.testclient import TestClient
 
-from app.main import app
-
-
-@pytest.fixture
-def client():
-    return TestClient(app)
+SEND_SMS_TARGET = "app.routers.actions.send_sms"
+MAKE_CALL_TARGET = "app.routers.actions.make_call"
+SMS_PAYLOAD = {"to": "+15551234567", "body": "Hello!"}
+CALL_PAYLOAD = {"to": "+15551234567", "purpose": "Should fail"}
+# Pre-encoded body for the 422 tests: valid JSON, missing required fields.
+_MISSING_FIELDS_BODY = b'{"to": "+15551234567"}'
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+_DUMMY_REQ = httpx.Request("POST", "http://test")
+_RESP_502 = httpx.Response(502, request=_DUMMY_REQ)
+_RESP_500 = httpx.Response(500, request=_DUMMY_REQ)
+
+# Control-plane failures map to 503 (not configured) or 502 (upstream error).
+ERROR_CASES = [
+    pytest.param(ValueError("TWILIO_PROXY_URL is not configured."), 503, id="no_proxy"),
+    pytest.param(
+        httpx.HTTPStatusError("Bad Gateway", request=_DUMMY_REQ, response=_RESP_502),
+        502,
+        id="bad_gateway",
+    ),
+    pytest.param(
+        httpx.HTTPStatusError("Server Error", request=_DUMMY_REQ, response=_RESP_500),
+        502,
+        id="server_error",
+    ),
+]
 
 
 # ---------------------------------------------------------------------------
@@ -17,16 +37,15 @@ def client():
 # ---------------------------------------------------------------------------
 
 
-def test_action_send_sms_success(client):
-    with patch(
-        "app.routers.actions.send_sms",
-        new_callable=AsyncMock,
-        return_value={"sid": "SM123", "status": "queued"},
-    ):
-        resp = client.post(
-            "/actions/send-sms",
-            json={"to": "+15551234567", "body": "Hello!"},
-        )
+@pytest.mark.asyncio
+async def test_action_send_sms_success(ac, monkeypatch):
+    monkeypatch.setattr(
+        SEND_SMS_TARGET, AsyncMock(return_value={"sid": "SM123", "status": "queued"})
+    )
+    resp = await ac.post(
+        "/actions/send-sms",
+        json=SMS_PAYLOAD,
+    )
 
     assert resp.status_code == 200
     data = resp.json()
@@ -34,16 +53,14 @@ def test_action_send_sms_success(client):
     assert data["sid"] == "SM123"
 
 
-def test_action_send_sms_with_from_number(client):
-    with patch(
-        "app.routers.actions.send_sms",
-        new_callable=AsyncMock,
-        return_value={"sid": "SM456", "status": "queued"},
-    ) as mock_send:
-        resp = client.post(
-            "/actions/send-sms",
-            json={"to": "+15551234567", "body": "Hello!", "from_number": "+15559876543"},
-        )
+@pytest.mark.asyncio
+async def test_action_send_sms_with_from_number(ac, monkeypatch):
+    mock_send = AsyncMock(return_value={"sid": "SM456", "status": "queued"})
+    monkeypatch.setattr(SEND_SMS_TARGET, mock_send)
+    resp = await ac.post(
+        "/actions/send-sms",
+        json={"to": "+15551234567", "body": "Hello!", "from_number": "+15559876543"},
+    )
 
     assert resp.status_code == 200
     mock_send.assert_called_once_with(
@@ -51,44 +68,21 @@ def test_action_send_sms_with_from_number(client):
     )
 
 
-def test_action_send_sms_no_proxy(client):
-    with patch(
-        "app.routers.actions.send_sms",
-        new_callable=AsyncMock,
-        side_effect=ValueError("TWILIO_PROXY_URL is not configured."),
-    ):
-        resp = client.post(
-            "/actions/send-sms",
-            json={"to": "+15551234567", "body": "Hello!"},
-        )
-
-    assert resp.status_code == 503
-    assert resp.json()["ok"] is False
-
-
-def test_action_send_sms_control_plane_error(client):
-    with patch(
-        "app.routers.actions.send_sms",
-        new_callable=AsyncMock,
-        side_effect=httpx.HTTPStatusError(
-            "Bad Gateway",
-            request=httpx.Request("POST", "http://test"),
-            response=httpx.Response(502),
-        ),
-    ):
-        resp = client.post(
-            "/actions/send-sms",
-            json={"to": "+15551234567", "body": "Hello!"},
-        )
+@pytest.mark.asyncio
+@pytest.mark.parametrize("side_effect, expected", ERROR_CASES)
+async def test_action_send_sms_error(ac, monkeypatch, side_effect, expected):
+    monkeypatch.setattr(SEND_SMS_TARGET, AsyncMock(side_effect=side_effect))
+    resp = await ac.post("/actions/send-sms", json=SMS_PAYLOAD)
 
-    assert resp.status_code == 502
-    assert resp.json()["ok"] is False
+    data = resp.json()
+    assert resp.status_code == expected
+    assert data["ok"] is False
 
 
-def test_action_send_sms_missing_body(client):
-    resp = client.post(
-        "/actions/send-sms",
-        json={"to": "+15551234567"},
+@pytest.mark.asyncio
+async def test_action_send_sms_missing_body(ac):
+    resp = await ac.post(
+        "/actions/send-sms", content=_MISSING_FIELDS_BODY, headers=_JSON_HEADERS
     )
     assert resp.status_code == 422  # Validation error
 
@@ -98,16 +92,18 @@ def test_action_send_sms_missing_body(client):
 # ---------------------------------------------------------------------------
 
 
-def test_action_make_call_success(client):
-    with patch(
-        "app.routers.actions.make_call",
-        new_callable=AsyncMock,
-        return_value={"sid": "CA123", "status": "queued", "session_id": "outbound-abc123"},
-    ):
-        resp = client.post(
-            "/actions/make-call",
-            json={"to": "+15551234567", "purpose": "Remind about meeting"},
-        )
+@pytest.mark.asyncio
+async def test_action_make_call_success(ac, monkeypatch):
+    monkeypatch.setattr(
+        MAKE_CALL_TARGET,
+        AsyncMock(
+            return_value={"sid": "CA123", "status": "queued", "session_id": "outbound-abc123"}
+        ),
+    )
+    resp = await ac.post(
+        "/actions/make-call",
+        json={"to": "+15551234567", "purpose": "Remind about meeting"},
+    )
 
     assert resp.status_code == 200
     data = resp.json()
@@ -116,58 +112,33 @@ def test_action_make_call_success(client):
     assert data["session_id"] == "outbound-abc123"
 
 
-def test_action_make_call_passes_correct_args(client):
-    with patch(
-        "app.routers.actions.make_call",
-        new_callable=AsyncMock,
-        return_value={"sid": "CA456", "status": "queued", "session_id": "outbound-def456"},
-    ) as mock_call:
-        resp = client.post(
-            "/actions/make-call",
-            json={"to": "+15551234567", "purpose": "Order pizza"},
-        )
+@pytest.mark.asyncio
+async def test_action_make_call_passes_correct_args(ac, monkeypatch):
+    mock_call = AsyncMock(return_value={"sid": "CA456", "status": "queued", "session_id": "outbound-def456"})
+    monkeypatch.setattr(MAKE_CALL_TARGET, mock_call)
+    resp = await ac.post(
+        "/actions/make-call",
+        json={"to": "+15551234567", "purpose": "Order pizza"},
+    )
 
     assert resp.status_code == 200
     mock_call.assert_called_once_with(to="+15551234567", purpose="Order pizza")
 
 
-def test_action_make_call_no_proxy(client):
-    with patch(
-        "app.routers.actions.make_call",
-        new_callable=AsyncMock,
-        side_effect=ValueError("TWILIO_PROXY_URL is not configured."),
-    ):
-        resp = client.post(
-            "/actions/make-call",
-            json={"to": "+15551234567", "purpose": "Should fail"},
-        )
-
-    assert resp.status_code == 503
-    assert resp.json()["ok"] is False
-
-
-def test_action_make_call_control_plane_error(client):
-    with patch(
-        "app.routers.actions.make_call",
-        new_callable=AsyncMock,
-        side_effect=httpx.HTTPStatusError(
-            "Server Error",
-            request=httpx.Request("POST", "http://test"),
-            response=httpx.Response(500),
-        ),
-    ):
-        resp = client.post(
-            "/actions/make-call",
-            json={"to": "+15551234567", "purpose": "Should fail"},
-        )
+@pytest.mark.asyncio
+@pytest.mark.parametrize("side_effect, expected", ERROR_CASES)
+async def test_action_make_call_error(ac, monkeypatch, side_effect, expected):
+    monkeypatch.setattr(MAKE_CALL_TARGET, AsyncMock(side_effect=side_effect))
+    resp = await ac.post("/actions/make-call", json=CALL_PAYLOAD)
 
-    assert resp.status_code == 502
-    assert resp.json()["ok"] is False
+    data = resp.json()
+    assert resp.status_code == expected
+    assert data["ok"] is False
 
 
-def test_action_make_call_missing_purpose(client):
-    resp = client.post(
-        "/actions/make-call",
-        json={"to": "+15551234567"},
+@pytest.mark.asyncio
+async def test_action_make_call_missing_purpose(ac):
+    resp = await ac.post(
+        "/actions/make-call", content=_MISSING_FIELDS_BODY, headers=_JSON_HEADERS
     )
     assert resp.status_code == 422  # Validation error
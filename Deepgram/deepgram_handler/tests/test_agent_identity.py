@@ -1,5 +1,5 @@
 # tests/test_agent_identity.py
-from unittest.mock import AsyncMock, patch
+from dataclasses import dataclass
 
 import pytest
 
@@ -12,7 +12,44 @@ from app.services.agent_identity import (
     parse_identity_md,
     serialize_identity_md,
 )
-from app.services.workspace import CallInfo, TranscriptEntry
+from app.services.workspace import CallInfo, TranscriptEntry, workspace_path
+
+
+@dataclass(frozen=True, slots=True)
+class FakeSettings:
+    OPENCLAW_AGENT_ID: str = "main"
+    OPENCLAW_GATEWAY_TOKEN: str = "gw-token"
+
+
+def amock(return_value=None):
+    """Cheap async stand-in for AsyncMock that records ``(args, kwargs)``."""
+    calls = []
+
+    async def fake(*args, **kwargs):
+        calls.append((args, kwargs))
+        return return_value
+
+    fake.calls = calls
+    return fake
+
+
+# Shared CallInfo fields; tests supply only the transcript.
+_BASE_CALL = {
+    "call_id": "abc123",
+    "phone_number": "+15551234567",
+    "direction": "inbound",
+    "ended_at": 1739480100,
+}
+
+
+_EMPTY_IDENTITY_MD = (
+    "# IDENTITY.md - Who Am I?\n\n"
+    "- **Name:**\n"
+    "- **Creature:**\n"
+    "- **Vibe:**\n"
+    "- **Emoji:**\n"
+    "- **Avatar:**\n"
+)
 
 
 # -- parse_identity_md --
@@ -127,117 +164,61 @@ def test_serialize_roundtrip():
 # -- extract_agent_identity (integration) --
 
 
-@pytest.mark.asyncio
-async def test_extract_identity_fills_empty(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
-
-    identity_path = tmp_path / "IDENTITY.md"
-    identity_path.write_text(
-        "# IDENTITY.md - Who Am I?\n\n"
-        "- **Name:**\n"
-        "- **Creature:**\n"
-        "- **Vibe:**\n"
-        "- **Emoji:**\n"
-        "- **Avatar:**\n"
-    )
-
-    class FakeSettings:
-        OPENCLAW_AGENT_ID = "main"
-        OPENCLAW_GATEWAY_TOKEN = "gw-token"
-
-    call_info = CallInfo(
-        call_id="abc123",
-        phone_number="+15551234567",
-        direction="inbound",
-        ended_at=1739480100.0,
-        transcript=[
-            TranscriptEntry(1000.0, "bot", "Hey! I'm thinking I'll go by Wren."),
-            TranscriptEntry(1001.0, "user", "Nice to meet you, Wren!"),
-        ],
-    )
-
-    with patch(
-        "app.services.agent_identity.call_anthropic", new_callable=AsyncMock
-    ) as mock_llm:
-        mock_llm.return_value = '{"name": "Wren", "vibe": "friendly and curious"}'
-        await extract_agent_identity(FakeSettings(), call_info)
-
-    content = identity_path.read_text()
-    assert "Wren" in content
-    assert "friendly and curious" in content
-
-
-@pytest.mark.asyncio
-async def test_extract_identity_skips_when_populated(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
-
-    identity_path = tmp_path / "IDENTITY.md"
-    identity_path.write_text(
-        "# IDENTITY.md - Who Am I?\n\n"
-        "- **Name:** Ripley\n"
-        "- **Creature:**\n"
-        "- **Vibe:**\n"
-        "- **Emoji:**\n"
-        "- **Avatar:**\n"
-    )
-
-    class FakeSettings:
-        OPENCLAW_AGENT_ID = "main"
-        OPENCLAW_GATEWAY_TOKEN = "gw-token"
-
-    call_info = CallInfo(
-        call_id="abc123",
-        phone_number="+15551234567",
-        direction="inbound",
-        ended_at=1739480100.0,
-        transcript=[
-            TranscriptEntry(1000.0, "user", "Hey"),
-        ],
-    )
-
-    with patch(
-        "app.services.agent_identity.call_anthropic", new_callable=AsyncMock
-    ) as mock_llm:
-        await extract_agent_identity(FakeSettings(), call_info)
-
-    mock_llm.assert_not_called()
+_NAMED_IDENTITY_MD = _EMPTY_IDENTITY_MD.replace("**Name:**", "**Name:** Ripley")
 
 
 @pytest.mark.asyncio
-async def test_extract_identity_discards_generic_name(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
-
-    identity_path = tmp_path / "IDENTITY.md"
-    identity_path.write_text(
-        "# IDENTITY.md - Who Am I?\n\n"
-        "- **Name:**\n"
-        "- **Creature:**\n"
-        "- **Vibe:**\n"
-        "- **Emoji:**\n"
-        "- **Avatar:**\n"
-    )
-
-    class FakeSettings:
-        OPENCLAW_AGENT_ID = "main"
-        OPENCLAW_GATEWAY_TOKEN = "gw-token"
-
-    call_info = CallInfo(
-        call_id="abc123",
-        phone_number="+15551234567",
-        direction="inbound",
-        ended_at=1739480100.0,
-        transcript=[
-            TranscriptEntry(1000.0, "user", "Hey assistant"),
-        ],
-    )
-
-    with patch(
-        "app.services.agent_identity.call_anthropic", new_callable=AsyncMock
-    ) as mock_llm:
-        mock_llm.return_value = '{"name": "Assistant", "vibe": "helpful"}'
-        await extract_agent_identity(FakeSettings(), call_info)
-
-    content = identity_path.read_text()
-    # "Assistant" should be discarded as generic, but "helpful" vibe should be written
-    assert "Assistant" not in content
-    assert "helpful" in content
+@pytest.mark.parametrize(
+    "initial, llm_return, transcript, expect_in, expect_not_in",
+    [
+        pytest.param(
+            _EMPTY_IDENTITY_MD,
+            '{"name": "Wren", "vibe": "friendly and curious"}',
+            [
+                TranscriptEntry(1000.0, "bot", "Hey! I'm thinking I'll go by Wren."),
+                TranscriptEntry(1001.0, "user", "Nice to meet you, Wren!"),
+            ],
+            ["Wren", "friendly and curious"],
+            [],
+            id="fills_empty",
+        ),
+        # Name already set: the LLM must not be called at all
+        pytest.param(
+            _NAMED_IDENTITY_MD,
+            None,
+            [TranscriptEntry(1000.0, "user", "Hey")],
+            ["Ripley"],
+            [],
+            id="skips_when_populated",
+        ),
+        # "Assistant" is discarded as generic, but the vibe is still written
+        pytest.param(
+            _EMPTY_IDENTITY_MD,
+            '{"name": "Assistant", "vibe": "helpful"}',
+            [TranscriptEntry(1000.0, "user", "Hey assistant")],
+            ["helpful"],
+            ["Assistant"],
+            id="discards_generic_name",
+        ),
+    ],
+)
+async def test_extract_identity(
+    workspace_fs, monkeypatch, initial, llm_return, transcript, expect_in, expect_not_in
+):
+    identity_path = workspace_path(FakeSettings(), "IDENTITY.md")
+    workspace_fs[identity_path] = initial
+
+    call_info = CallInfo(**_BASE_CALL, transcript=transcript)
+
+    fake_llm = amock(llm_return)
+    monkeypatch.setattr("app.services.agent_identity.call_anthropic", fake_llm)
+    await extract_agent_identity(FakeSettings(), call_info)
+
+    # A populated identity short-circuits before the LLM is consulted
+    assert len(fake_llm.calls) == (0 if llm_return is None else 1)
+
+    content = workspace_fs[identity_path]
+    for text in expect_in:
+        assert text in content
+    for text in expect_not_in:
+        assert text not in content
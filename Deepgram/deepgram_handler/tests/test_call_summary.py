@@ -1,4 +1,5 @@
 # tests/test_call_summary.py
+from dataclasses import dataclass
 from unittest.mock import AsyncMock, patch
 
 import pytest
@@ -7,7 +8,24 @@ from app.services.call_summary import (
     generate_call_summary,
     trim_call_entries,
 )
-from app.services.workspace import CallInfo, TranscriptEntry
+from app.services.workspace import CallInfo, TranscriptEntry, workspace_path
+
+
+@dataclass(frozen=True, slots=True)
+class FakeSettings:
+    OPENCLAW_AGENT_ID: str = "main"
+    OPENCLAW_GATEWAY_TOKEN: str = "gw-token"
+    TIMEZONE: str = "UTC"
+    CALLS_MAX_ENTRIES: int = 50
+
+
+# Shared CallInfo fields; tests supply only the transcript.
+_BASE_CALL = {
+    "call_id": "abc123",
+    "phone_number": "+15551234567",
+    "direction": "inbound",
+    "ended_at": 1739480100,
+}
 
 
 # -- trim_call_entries --
@@ -23,59 +41,57 @@ def test_trim_call_entries_under_max():
     assert result == content
 
 
-def test_trim_call_entries_at_max():
-    content = "# Call History\n\n### Entry 1\nSummary 1.\n\n### Entry 2\nSummary 2.\n"
-    result = trim_call_entries(content, max_entries=2)
-    assert "Entry 1" in result
-    assert "Entry 2" in result
-
-
-def test_trim_call_entries_over_max():
-    content = (
-        "# Call History\n\n"
-        "### Entry 1\nOldest.\n\n"
-        "### Entry 2\nMiddle.\n\n"
-        "### Entry 3\nNewest.\n"
-    )
-    result = trim_call_entries(content, max_entries=2)
-    assert "Entry 1" not in result
-    assert "Entry 2" in result
-    assert "Entry 3" in result
-    assert result.startswith("# Call History")
-
-
-def test_trim_call_entries_preserves_header():
-    content = "# Call History\n\n### Entry 1\nOld.\n\n### Entry 2\nNew.\n"
-    result = trim_call_entries(content, max_entries=1)
+@pytest.mark.parametrize(
+    "content, max_entries, must_in, must_not_in",
+    [
+        pytest.param(
+            "# Call History\n\n### Entry 1\nSummary 1.\n\n### Entry 2\nSummary 2.\n",
+            2,
+            ["Entry 1", "Entry 2"],
+            [],
+            id="at_max",
+        ),
+        pytest.param(
+            "# Call History\n\n"
+            "### Entry 1\nOldest.\n\n"
+            "### Entry 2\nMiddle.\n\n"
+            "### Entry 3\nNewest.\n",
+            2,
+            ["Entry 2", "Entry 3"],
+            ["Entry 1"],
+            id="over_max",
+        ),
+        pytest.param(
+            "# Call History\n\n### Entry 1\nOld.\n\n### Entry 2\nNew.\n",
+            1,
+            ["Entry 2"],
+            ["Entry 1"],
+            id="preserves_header",
+        ),
+    ],
+)
+def test_trim_call_entries(content, max_entries, must_in, must_not_in):
+    result = trim_call_entries(content, max_entries=max_entries)
     assert result.startswith("# Call History")
-    assert "Entry 1" not in result
-    assert "Entry 2" in result
+    for text in must_in:
+        assert text in result
+    for text in must_not_in:
+        assert text not in result
 
 
 # -- generate_call_summary --
 
 
 @pytest.mark.asyncio
-async def test_generate_call_summary_appends_entry(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
-
+async def test_generate_call_summary_appends_entry(workspace_fs):
+    calls_path = workspace_path(FakeSettings(), "CALLS.md")
     # Pre-existing CALLS.md
-    calls_path = tmp_path / "CALLS.md"
-    calls_path.write_text(
+    workspace_fs[calls_path] = (
         "# Call History\n\n### 02/12/2026, 1:00 PM -- +15550000000 (inbound)\nOld call.\n"
     )
 
-    class FakeSettings:
-        OPENCLAW_AGENT_ID = "main"
-        OPENCLAW_GATEWAY_TOKEN = "gw-token"
-        TIMEZONE = "UTC"
-        CALLS_MAX_ENTRIES = 50
-
     call_info = CallInfo(
-        call_id="abc123",
-        phone_number="+15551234567",
-        direction="inbound",
-        ended_at=1739480100.0,  # Known timestamp
+        **_BASE_CALL,
         transcript=[
             TranscriptEntry(timestamp=1000.0, speaker="bot", text="Hello!"),
             TranscriptEntry(timestamp=1001.0, speaker="user", text="Hi there"),
@@ -88,7 +104,7 @@ async def test_generate_call_summary_appends_entry(tmp_path, monkeypatch):
         mock_llm.return_value = "Caller said hi. Brief greeting exchange."
         await generate_call_summary(FakeSettings(), call_info)
 
-    content = calls_path.read_text()
+    content = workspace_fs[calls_path]
     assert "Old call." in content
     assert "+15551234567 (inbound)" in content
     assert "Brief greeting exchange." in content
@@ -99,20 +115,11 @@ async def test_generate_call_summary_appends_entry(tmp_path, monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_generate_call_summary_creates_file_if_missing(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
-
-    class FakeSettings:
-        OPENCLAW_AGENT_ID = "main"
-        OPENCLAW_GATEWAY_TOKEN = "gw-token"
-        TIMEZONE = "UTC"
-        CALLS_MAX_ENTRIES = 50
+async def test_generate_call_summary_creates_file_if_missing(workspace_fs):
+    calls_path = workspace_path(FakeSettings(), "CALLS.md")
 
     call_info = CallInfo(
-        call_id="abc123",
-        phone_number="+15551234567",
-        direction="inbound",
-        ended_at=1739480100.0,
+        **_BASE_CALL,
         transcript=[
             TranscriptEntry(timestamp=1000.0, speaker="user", text="Hey"),
         ],
@@ -124,26 +131,17 @@ async def test_generate_call_summary_creates_file_if_missing(tmp_path, monkeypat
         mock_llm.return_value = "Quick hello."
         await generate_call_summary(FakeSettings(), call_info)
 
-    content = (tmp_path / "CALLS.md").read_text()
+    content = workspace_fs[calls_path]
     assert content.startswith("# Call History")
     assert "Quick hello." in content
 
 
 @pytest.mark.asyncio
-async def test_generate_call_summary_skips_on_llm_failure(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
-
-    class FakeSettings:
-        OPENCLAW_AGENT_ID = "main"
-        OPENCLAW_GATEWAY_TOKEN = "gw-token"
-        TIMEZONE = "UTC"
-        CALLS_MAX_ENTRIES = 50
+async def test_generate_call_summary_skips_on_llm_failure(workspace_fs):
+    calls_path = workspace_path(FakeSettings(), "CALLS.md")
 
     call_info = CallInfo(
-        call_id="abc123",
-        phone_number="+15551234567",
-        direction="inbound",
-        ended_at=1739480100.0,
+        **_BASE_CALL,
         transcript=[
             TranscriptEntry(timestamp=1000.0, speaker="user", text="Hey"),
         ],
@@ -156,32 +154,24 @@ async def test_generate_call_summary_skips_on_llm_failure(tmp_path, monkeypatch)
         await generate_call_summary(FakeSettings(), call_info)
 
     # File should not be created
-    assert not (tmp_path / "CALLS.md").exists()
+    assert calls_path not in workspace_fs
 
 
 @pytest.mark.asyncio
-async def test_generate_call_summary_trims_to_max(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
+async def test_generate_call_summary_trims_to_max(workspace_fs):
+    calls_path = workspace_path(FakeSettings(), "CALLS.md")
 
     # Create file with 3 existing entries
     entries = "# Call History\n\n"
     for i in range(3):
         entries += f"### Entry {i}\nSummary {i}.\n\n"
 
-    calls_path = tmp_path / "CALLS.md"
-    calls_path.write_text(entries)
+    workspace_fs[calls_path] = entries
 
-    class FakeSettings:
-        OPENCLAW_AGENT_ID = "main"
-        OPENCLAW_GATEWAY_TOKEN = "gw-token"
-        TIMEZONE = "UTC"
-        CALLS_MAX_ENTRIES = 2  # Only keep 2
+    settings = FakeSettings(CALLS_MAX_ENTRIES=2)  # Only keep 2
 
     call_info = CallInfo(
-        call_id="abc123",
-        phone_number="+15551234567",
-        direction="inbound",
-        ended_at=1739480100.0,
+        **_BASE_CALL,
         transcript=[
             TranscriptEntry(timestamp=1000.0, speaker="user", text="Hey"),
         ],
@@ -191,9 +181,9 @@ async def test_generate_call_summary_trims_to_max(tmp_path, monkeypatch):
         "app.services.call_summary.call_anthropic", new_callable=AsyncMock
     ) as mock_llm:
         mock_llm.return_value = "New call summary."
-        await generate_call_summary(FakeSettings(), call_info)
+        await generate_call_summary(settings, call_info)
 
-    content = calls_path.read_text()
+    content = workspace_fs[calls_path]
     # Only last 2 entries should remain (entry 2 + new one)
     assert "Entry 0" not in content
     assert "Entry 1" not in content
@@ -1,24 +1,41 @@
-import os
-from unittest.mock import AsyncMock, patch
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock
 
 import httpx
 import pytest
-from fastapi import WebSocketDisconnect
 
-from app.config import Settings
+import app.services.deepgram_agent as _dga
 from app.services.deepgram_agent import (
+    _read_file,
     _read_next_greeting,
+    build_inject_message,
     build_settings_config,
     run_agent_bridge,
 )
+from tests.helpers.fakes import (
+    FakeDeepgramWS,
+    FakeResp,
+    FakeTwilioWS,
+    connect_returning,
+)
+
 
+_AGENT_HTTPX_CLIENT = "app.services.deepgram_agent.httpx.AsyncClient"
+
+# USER_MD_PATH and NEXT_GREETING_PATH are already sandboxed by conftest.
+_EMPTY_WORKSPACE_FILES = (
+    ("IDENTITY_MD_PATH", "nope-id.md"),
+    ("CALLS_MD_PATH", "nope-calls.md"),
+)
 
-def _mock_workspace_empty(monkeypatch, tmp_path):
+
+@pytest.fixture
+def empty_workspace(monkeypatch, tmp_path):
     """Point all workspace paths at nonexistent files (first-caller scenario)."""
-    monkeypatch.setattr("app.services.deepgram_agent.USER_MD_PATH", tmp_path / "nope.md")
-    monkeypatch.setattr("app.services.deepgram_agent.IDENTITY_MD_PATH", tmp_path / "nope-id.md")
-    monkeypatch.setattr("app.services.deepgram_agent.CALLS_MD_PATH", tmp_path / "nope-calls.md")
-    monkeypatch.setattr("app.services.deepgram_agent.NEXT_GREETING_PATH", tmp_path / "nope.txt")
+    for name, filename in _EMPTY_WORKSPACE_FILES:
+        monkeypatch.setattr(_dga, name, tmp_path / filename)
+    return tmp_path
 
 
 FILLED_USER_MD = """\
@@ -71,202 +88,209 @@ Discussed deployment blockers.
 Testing the new prompt builder.
 """
 
+_FILLED_USER_MD_B = FILLED_USER_MD.encode("utf-8")
+_BLANK_USER_MD_B = BLANK_USER_MD.encode("utf-8")
+_FILLED_IDENTITY_MD_B = FILLED_IDENTITY_MD.encode("utf-8")
+_BLANK_IDENTITY_MD_B = BLANK_IDENTITY_MD.encode("utf-8")
+_SAMPLE_CALLS_MD_B = SAMPLE_CALLS_MD.encode("utf-8")
 
-def test_build_settings_config_defaults():
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="abc123")
-
-    assert config["type"] == "Settings"
 
-    # Audio: mulaw 8kHz in and out
-    assert config["audio"]["input"]["encoding"] == "mulaw"
-    assert config["audio"]["input"]["sample_rate"] == 8000
-    assert config["audio"]["output"]["encoding"] == "mulaw"
-    assert config["audio"]["output"]["sample_rate"] == 8000
-    assert config["audio"]["output"]["container"] == "none"
-
-    # Agent config
-    agent = config["agent"]
-    assert agent["listen"]["provider"]["type"] == "deepgram"
-    assert agent["listen"]["provider"]["model"] == "flux-general-en"
-
-    think = agent["think"]
-    assert think["provider"]["type"] == "open_ai"
-    assert think["provider"]["model"] == "anthropic/claude-sonnet-4-5"
-    assert (
-        think["endpoint"]["url"]
-        == "https://deepclaw-instance.fly.dev/v1/chat/completions"
-    )
-    assert think["endpoint"]["headers"]["Authorization"] == "Bearer gw-token"
-    assert think["endpoint"]["headers"]["x-openclaw-session-key"] == "agent:main:abc123"
-    assert "fly-force-instance-id" not in think["endpoint"]["headers"]
-    assert "prompt" in think
+@pytest.fixture(scope="session")
+def filled_workspace(tmp_path_factory):
+    """USER.md, IDENTITY.md and CALLS.md for a known caller, written once."""
+    ws = tmp_path_factory.mktemp("ws")
+    (ws / "user.md").write_bytes(_FILLED_USER_MD_B)
+    (ws / "identity.md").write_bytes(_FILLED_IDENTITY_MD_B)
+    (ws / "calls.md").write_bytes(_SAMPLE_CALLS_MD_B)
+    return ws
 
-    assert agent["speak"]["provider"]["type"] == "deepgram"
-    assert agent["speak"]["provider"]["model"] == "aura-2-thalia-en"
-    assert "greeting" in agent
 
+@pytest.fixture
+def returning_caller(filled_workspace, monkeypatch):
+    """Point the agent at the filled workspace; there is no NEXT_GREETING.txt."""
+    monkeypatch.setattr(_dga, "USER_MD_PATH", filled_workspace / "user.md")
+    monkeypatch.setattr(_dga, "IDENTITY_MD_PATH", filled_workspace / "identity.md")
+    monkeypatch.setattr(_dga, "CALLS_MD_PATH", filled_workspace / "calls.md")
+    monkeypatch.setattr(_dga, "NEXT_GREETING_PATH", filled_workspace / "nope.txt")
+    return filled_workspace
 
-def test_build_settings_config_with_fly_machine_id():
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    with patch.dict(os.environ, {"FLY_MACHINE_ID": "machine-xyz"}):
-        config = build_settings_config(settings, call_id="abc123")
 
-    headers = config["agent"]["think"]["endpoint"]["headers"]
-    assert headers["fly-force-instance-id"] == "machine-xyz"
+def dig(config: dict, path: str):
+    """Look up a dotted path such as ``agent.think.provider.model``."""
+    for key in path.split("."):
+        config = config[key]
+    return config
 
 
-def test_build_settings_config_custom(tmp_path, monkeypatch):
-    """Custom models, URLs, and agent ID are wired through correctly."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        OPENCLAW_AGENT_ID="custom-agent",
-        PUBLIC_URL="https://custom.example.com",
-        AGENT_LISTEN_MODEL="nova-3",
-        AGENT_THINK_MODEL="anthropic/claude-sonnet-4-5-20250929",
-        AGENT_VOICE="aura-2-luna-en",
-        AGENT_GREETING="Ahoy!",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="call-99")
-    agent = config["agent"]
-
-    assert agent["listen"]["provider"]["model"] == "nova-3"
-    assert agent["think"]["provider"]["model"] == "anthropic/claude-sonnet-4-5-20250929"
-    assert (
-        agent["think"]["endpoint"]["url"]
-        == "https://custom.example.com/v1/chat/completions"
-    )
-    assert (
-        agent["think"]["endpoint"]["headers"]["x-openclaw-session-key"]
-        == "agent:custom-agent:call-99"
-    )
-    # Inbound calls use _build_voice_prompt() — prompt contains voice constraints
-    assert "Voice constraints" in agent["think"]["prompt"] or "phone call" in agent["think"]["prompt"]
-    assert agent["speak"]["provider"]["model"] == "aura-2-luna-en"
-    # No USER.md → first caller → uses settings.AGENT_GREETING as fallback
-    assert agent["greeting"] == "Ahoy!"
-
-
-def test_build_settings_config_with_prompt_override():
-    """Prompt override is used for outbound calls where the callee is not the user."""
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        AGENT_PROMPT="Default prompt.",
-        AGENT_GREETING="Default greeting.",
-        _env_file=None,
-    )
-    config = build_settings_config(
-        settings,
-        call_id="outbound-abc123",
-        prompt_override="Call the pizza place and order a large pepperoni.",
-        greeting_override="Hello!",
-    )
-    agent = config["agent"]
+_DEFAULT_CONFIG = [
+    ("type", "Settings"),
+    # Audio: mulaw 8kHz in and out
+    ("audio.input.encoding", "mulaw"),
+    ("audio.input.sample_rate", 8000),
+    ("audio.output.encoding", "mulaw"),
+    ("audio.output.sample_rate", 8000),
+    ("audio.output.container", "none"),
+    ("agent.listen.provider.type", "deepgram"),
+    ("agent.listen.provider.model", "flux-general-en"),
+    ("agent.think.provider.type", "open_ai"),
+    ("agent.think.provider.model", "anthropic/claude-sonnet-4-5"),
+    ("agent.think.endpoint.url", "https://deepclaw-instance.fly.dev/v1/chat/completions"),
+    ("agent.think.endpoint.headers.Authorization", "Bearer gw-token"),
+    ("agent.think.endpoint.headers.x-openclaw-session-key", "agent:main:abc123"),
+    ("agent.speak.provider.type", "deepgram"),
+    ("agent.speak.provider.model", "aura-2-thalia-en"),
+    # No USER.md -> first caller -> settings.AGENT_GREETING
+    ("agent.greeting", "Hello! How can I help you today?"),
+]
+
+
+@pytest.mark.parametrize(
+    "overrides, call_kwargs, prompt_snippet, expected",
+    [
+        pytest.param(
+            {},
+            {"call_id": "abc123"},
+            # Inbound calls use _build_voice_prompt()
+            "Voice constraints",
+            _DEFAULT_CONFIG,
+            id="defaults",
+        ),
+        pytest.param(
+            {
+                "OPENCLAW_AGENT_ID": "custom-agent",
+                "PUBLIC_URL": "https://custom.example.com",
+                "AGENT_LISTEN_MODEL": "nova-3",
+                "AGENT_THINK_MODEL": "anthropic/claude-sonnet-4-5-20250929",
+                "AGENT_VOICE": "aura-2-luna-en",
+                "AGENT_GREETING": "Ahoy!",
+            },
+            {"call_id": "call-99"},
+            "Voice constraints",
+            [
+                ("agent.listen.provider.model", "nova-3"),
+                ("agent.think.provider.model", "anthropic/claude-sonnet-4-5-20250929"),
+                ("agent.think.endpoint.url", "https://custom.example.com/v1/chat/completions"),
+                ("agent.think.endpoint.headers.x-openclaw-session-key", "agent:custom-agent:call-99"),
+                ("agent.speak.provider.model", "aura-2-luna-en"),
+                ("agent.greeting", "Ahoy!"),
+            ],
+            id="custom",
+        ),
+        # Outbound calls, where the callee is not the user
+        pytest.param(
+            {"AGENT_PROMPT": "Default prompt.", "AGENT_GREETING": "Default greeting."},
+            {
+                "call_id": "outbound-abc123",
+                "prompt_override": "Call the pizza place and order a large pepperoni.",
+                "greeting_override": "Hello!",
+            },
+            "Call the pizza place and order a large pepperoni.",
+            [
+                ("agent.think.prompt", "Call the pizza place and order a large pepperoni."),
+                ("agent.greeting", "Hello!"),
+                ("agent.think.endpoint.headers.x-openclaw-session-key", "agent:main:outbound-abc123"),
+            ],
+            id="prompt_override",
+        ),
+        pytest.param(
+            {},
+            {"call_id": "outbound-xyz789", "prompt_override": "Check on delivery status."},
+            "Check on delivery status.",
+            [
+                ("agent.think.prompt", "Check on delivery status."),
+                # Prompt override without greeting override defaults to "Hello!"
+                ("agent.greeting", "Hello!"),
+            ],
+            id="prompt_override_default_greeting",
+        ),
+    ],
+)
+def test_build_settings_config(
+    empty_workspace, base_settings, overrides, call_kwargs, prompt_snippet, expected
+):
+    settings = base_settings.model_copy(update=overrides)
+    config = build_settings_config(settings, **call_kwargs)
 
-    assert (
-        agent["think"]["prompt"] == "Call the pizza place and order a large pepperoni."
-    )
-    assert agent["greeting"] == "Hello!"
-    # Session key uses the provided call_id
-    assert (
-        "outbound-abc123"
-        in agent["think"]["endpoint"]["headers"]["x-openclaw-session-key"]
-    )
+    for path, value in expected:
+        assert dig(config, path) == value, path
+    assert prompt_snippet in dig(config, "agent.think.prompt")
 
 
-def test_build_settings_config_prompt_override_default_greeting():
-    """Prompt override without greeting override defaults to 'Hello!'."""
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    config = build_settings_config(
-        settings,
-        call_id="outbound-xyz789",
-        prompt_override="Check on delivery status.",
-    )
+def test_build_settings_config_with_fly_machine_id(base_settings, monkeypatch):
+    monkeypatch.delenv("FLY_MACHINE_ID", raising=False)
+    config = build_settings_config(base_settings, call_id="abc123")
+    assert "fly-force-instance-id" not in dig(config, "agent.think.endpoint.headers")
 
-    assert config["agent"]["think"]["prompt"] == "Check on delivery status."
-    assert config["agent"]["greeting"] == "Hello!"
+    monkeypatch.setenv("FLY_MACHINE_ID", "machine-xyz")
+    config = build_settings_config(base_settings, call_id="abc123")
+    headers = dig(config, "agent.think.endpoint.headers")
+    assert headers["fly-force-instance-id"] == "machine-xyz"
 
 
-def test_read_next_greeting_returns_content(tmp_path, monkeypatch):
+def test_read_next_greeting_returns_content(tmp_path):
     greeting_file = tmp_path / "NEXT_GREETING.txt"
     greeting_file.write_text("Hey, welcome back you legend.")
-    monkeypatch.setattr("app.services.deepgram_agent.NEXT_GREETING_PATH", greeting_file)
     assert _read_next_greeting() == "Hey, welcome back you legend."
 
 
-def test_read_next_greeting_returns_none_when_missing(tmp_path, monkeypatch):
-    greeting_file = tmp_path / "NEXT_GREETING.txt"
-    monkeypatch.setattr("app.services.deepgram_agent.NEXT_GREETING_PATH", greeting_file)
+def test_read_next_greeting_returns_none_when_missing():
     assert _read_next_greeting() is None
 
 
-def test_read_next_greeting_returns_none_when_empty(tmp_path, monkeypatch):
+def test_read_next_greeting_returns_none_when_empty(tmp_path):
     greeting_file = tmp_path / "NEXT_GREETING.txt"
     greeting_file.write_text("   ")
-    monkeypatch.setattr("app.services.deepgram_agent.NEXT_GREETING_PATH", greeting_file)
     assert _read_next_greeting() is None
 
 
-def test_build_settings_uses_next_greeting_file(tmp_path, monkeypatch):
+def test_read_file_reuses_cached_content_until_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / "USER.md"
+    path.write_text("- **Name:** Bill")
+    assert _read_file(path) == "- **Name:** Bill"
+
+    reads = []
+    real_read_text = Path.read_text
+
+    def counting_read_text(self, *args, **kwargs):
+        reads.append(self)
+        return real_read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", counting_read_text)
+
+    # Unchanged file is served from the cache
+    assert _read_file(path) == "- **Name:** Bill"
+    assert reads == []
+
+    # A rewrite (new size and mtime) is picked up
+    path.write_text("- **Name:** William")
+    assert _read_file(path) == "- **Name:** William"
+    assert reads == [path]
+
+
+def test_build_settings_uses_next_greeting_file(empty_workspace, base_settings):
     """When NEXT_GREETING.txt exists, use it as the greeting."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-    greeting_file = tmp_path / "NEXT_GREETING.txt"
+    greeting_file = empty_workspace / "NEXT_GREETING.txt"
     greeting_file.write_text("So you're back. What do you need?")
-    monkeypatch.setattr("app.services.deepgram_agent.NEXT_GREETING_PATH", greeting_file)
 
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="abc123")
+    config = build_settings_config(base_settings, call_id="abc123")
     assert config["agent"]["greeting"] == "So you're back. What do you need?"
 
 
-def test_build_settings_falls_back_when_no_greeting_file(tmp_path, monkeypatch):
+def test_build_settings_falls_back_when_no_greeting_file(empty_workspace, base_settings):
     """When no NEXT_GREETING.txt, fall back to default greeting."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
+    settings = base_settings
     config = build_settings_config(settings, call_id="abc123")
     # Falls back to the settings default
     assert config["agent"]["greeting"] == settings.AGENT_GREETING
 
 
-def test_build_settings_greeting_file_ignored_for_outbound(tmp_path, monkeypatch):
+def test_build_settings_greeting_file_ignored_for_outbound(tmp_path, base_settings):
     """Outbound calls always use greeting_override, not the file."""
     greeting_file = tmp_path / "NEXT_GREETING.txt"
     greeting_file.write_text("This should NOT be used.")
-    monkeypatch.setattr("app.services.deepgram_agent.NEXT_GREETING_PATH", greeting_file)
 
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
     config = build_settings_config(
-        settings,
+        base_settings,
         call_id="outbound-xyz",
         prompt_override="Call the dentist.",
         greeting_override="Hi there!",
@@ -275,41 +299,26 @@ def test_build_settings_greeting_file_ignored_for_outbound(tmp_path, monkeypatch
 
 
 @pytest.mark.asyncio
-async def test_generate_next_greeting_writes_file(tmp_path, monkeypatch):
+async def test_generate_next_greeting_writes_file(
+    tmp_path, base_settings, mock_httpx_client
+):
     from app.services.deepgram_agent import _generate_next_greeting
     from app.services.workspace import TranscriptEntry
 
     greeting_file = tmp_path / "NEXT_GREETING.txt"
-    monkeypatch.setattr("app.services.deepgram_agent.NEXT_GREETING_PATH", greeting_file)
-
-    mock_response = httpx.Response(
-        200,
-        json={
-            "content": [{"type": "text", "text": "Back again? Let's make it count."}]
-        },
-        request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
-    )
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    mock_client.post = AsyncMock(return_value=mock_response)
-    monkeypatch.setattr(
-        "app.services.deepgram_agent.httpx.AsyncClient", lambda: mock_client
+
+    mock_response = FakeResp(
+        {"content": [{"type": "text", "text": "Back again? Let's make it count."}]}
     )
+    mock_post = mock_httpx_client(mock_response, target=_AGENT_HTTPX_CLIENT)
 
     transcript = [
         TranscriptEntry(timestamp=1.0, speaker="user", text="What's the weather?"),
         TranscriptEntry(timestamp=2.0, speaker="bot", text="It's sunny today."),
     ]
 
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        ANTHROPIC_API_KEY="test-anthropic-key",
-        _env_file=None,
-    )
     await _generate_next_greeting(
-        settings,
+        base_settings,
         session_key="agent:main:abc123",
         transcript=transcript,
         caller_name="Bill",
@@ -318,7 +327,7 @@ async def test_generate_next_greeting_writes_file(tmp_path, monkeypatch):
     assert greeting_file.read_text() == "Back again? Let's make it count."
 
     # Verify the prompt included caller context
-    call_args = mock_client.post.call_args
+    call_args = mock_post.call_args
     messages = call_args[1]["json"]["messages"]
     prompt_text = messages[0]["content"]
     assert "Bill" in prompt_text
@@ -326,67 +335,40 @@ async def test_generate_next_greeting_writes_file(tmp_path, monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_generate_next_greeting_handles_failure(tmp_path, monkeypatch):
+async def test_generate_next_greeting_handles_failure(
+    tmp_path, base_settings, mock_httpx_client
+):
     """If Anthropic call fails, no file is written and no exception propagates."""
     from app.services.deepgram_agent import _generate_next_greeting
 
     greeting_file = tmp_path / "NEXT_GREETING.txt"
-    monkeypatch.setattr("app.services.deepgram_agent.NEXT_GREETING_PATH", greeting_file)
 
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    mock_client.post = AsyncMock(side_effect=httpx.ConnectError("connection refused"))
-    monkeypatch.setattr(
-        "app.services.deepgram_agent.httpx.AsyncClient", lambda: mock_client
+    mock_httpx_client(
+        exc=httpx.ConnectError("connection refused"), target=_AGENT_HTTPX_CLIENT
     )
 
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        ANTHROPIC_API_KEY="test-anthropic-key",
-        _env_file=None,
-    )
     # Should not raise
-    await _generate_next_greeting(settings, session_key="agent:main:abc123")
+    await _generate_next_greeting(base_settings, session_key="agent:main:abc123")
 
     assert not greeting_file.exists()
 
 
 @pytest.mark.asyncio
-async def test_run_agent_bridge_calls_generate_next_greeting(monkeypatch):
+async def test_run_agent_bridge_calls_generate_next_greeting(
+    monkeypatch, base_settings
+):
     """After bridge finishes, _generate_next_greeting is called for inbound calls."""
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-
-    # Mock the websocket connection to Deepgram so it immediately closes
-    mock_dg_ws = AsyncMock()
-    mock_dg_ws.close = AsyncMock()
-    mock_dg_ws.send = AsyncMock()
-
-    # Make __aiter__ return an empty async iterator
-    async def empty_iter():
-        return
-        yield  # noqa: F841
+    settings = base_settings
 
-    mock_dg_ws.__aiter__ = lambda self: empty_iter()
-
-    mock_connect = AsyncMock(return_value=mock_dg_ws)
-    monkeypatch.setattr("app.services.deepgram_agent.connect", mock_connect)
+    # Deepgram socket that closes immediately
+    dg_ws = FakeDeepgramWS()
+    monkeypatch.setattr(_dga, "connect", connect_returning(dg_ws))
 
     mock_generate = AsyncMock()
-    monkeypatch.setattr(
-        "app.services.deepgram_agent._generate_next_greeting", mock_generate
-    )
-
-    mock_twilio_ws = AsyncMock()
-    mock_twilio_ws.receive_text = AsyncMock(side_effect=WebSocketDisconnect())
+    monkeypatch.setattr(_dga, "_generate_next_greeting", mock_generate)
 
     await run_agent_bridge(
-        mock_twilio_ws, "stream-123", settings=settings, call_id="test-call"
+        FakeTwilioWS(), "stream-123", settings=settings, call_id="test-call"
     )
 
     mock_generate.assert_called_once()
@@ -395,39 +377,25 @@ async def test_run_agent_bridge_calls_generate_next_greeting(monkeypatch):
     assert "test-call" in call_args[1]["session_key"]
     assert "transcript" in call_args[1]
 
+    # The Settings config goes out first and the socket is closed on teardown
+    assert json.loads(dg_ws.sent[0])["type"] == "Settings"
+    assert dg_ws.closed
+
 
 @pytest.mark.asyncio
-async def test_run_agent_bridge_skips_greeting_gen_for_outbound(monkeypatch):
+async def test_run_agent_bridge_skips_greeting_gen_for_outbound(
+    monkeypatch, base_settings
+):
     """Outbound calls (prompt_override set) should NOT generate a next greeting."""
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-
-    mock_dg_ws = AsyncMock()
-    mock_dg_ws.close = AsyncMock()
-    mock_dg_ws.send = AsyncMock()
+    settings = base_settings
 
-    async def empty_iter():
-        return
-        yield
-
-    mock_dg_ws.__aiter__ = lambda self: empty_iter()
-
-    mock_connect = AsyncMock(return_value=mock_dg_ws)
-    monkeypatch.setattr("app.services.deepgram_agent.connect", mock_connect)
+    monkeypatch.setattr(_dga, "connect", connect_returning(FakeDeepgramWS()))
 
     mock_generate = AsyncMock()
-    monkeypatch.setattr(
-        "app.services.deepgram_agent._generate_next_greeting", mock_generate
-    )
-
-    mock_twilio_ws = AsyncMock()
-    mock_twilio_ws.receive_text = AsyncMock(side_effect=WebSocketDisconnect())
+    monkeypatch.setattr(_dga, "_generate_next_greeting", mock_generate)
 
     await run_agent_bridge(
-        mock_twilio_ws,
+        FakeTwilioWS(),
         "stream-456",
         settings=settings,
         call_id="outbound-abc",
@@ -438,33 +406,16 @@ async def test_run_agent_bridge_skips_greeting_gen_for_outbound(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_run_agent_bridge_registers_session(monkeypatch):
+async def test_run_agent_bridge_registers_session(monkeypatch, base_settings):
     """Bridge registers the session key in the session registry on connect."""
     from app.services import session_registry
 
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-
-    mock_dg_ws = AsyncMock()
-    mock_dg_ws.close = AsyncMock()
-    mock_dg_ws.send = AsyncMock()
+    settings = base_settings
 
-    async def empty_iter():
-        return
-        yield
-
-    mock_dg_ws.__aiter__ = lambda self: empty_iter()
-
-    mock_connect = AsyncMock(return_value=mock_dg_ws)
-    monkeypatch.setattr("app.services.deepgram_agent.connect", mock_connect)
+    monkeypatch.setattr(_dga, "connect", connect_returning(FakeDeepgramWS()))
 
     mock_generate = AsyncMock()
-    monkeypatch.setattr(
-        "app.services.deepgram_agent._generate_next_greeting", mock_generate
-    )
+    monkeypatch.setattr(_dga, "_generate_next_greeting", mock_generate)
 
     # Track register/unregister calls
     registered_keys: list[str] = []
@@ -480,18 +431,11 @@ async def test_run_agent_bridge_registers_session(monkeypatch):
         unregistered_keys.append(key)
         original_unregister(key)
 
-    monkeypatch.setattr(
-        "app.services.deepgram_agent.session_registry.register", track_register
-    )
-    monkeypatch.setattr(
-        "app.services.deepgram_agent.session_registry.unregister", track_unregister
-    )
-
-    mock_twilio_ws = AsyncMock()
-    mock_twilio_ws.receive_text = AsyncMock(side_effect=WebSocketDisconnect())
+    monkeypatch.setattr(_dga.session_registry, "register", track_register)
+    monkeypatch.setattr(_dga.session_registry, "unregister", track_unregister)
 
     await run_agent_bridge(
-        mock_twilio_ws, "stream-reg", settings=settings, call_id="reg-call"
+        FakeTwilioWS(), "stream-reg", settings=settings, call_id="reg-call"
     )
 
     # Should have registered with the session key
@@ -505,44 +449,24 @@ async def test_run_agent_bridge_registers_session(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_run_agent_bridge_unregisters_on_error(monkeypatch):
+async def test_run_agent_bridge_unregisters_on_error(monkeypatch, base_settings):
     """Session is unregistered even if the bridge errors out."""
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-
-    mock_dg_ws = AsyncMock()
-    mock_dg_ws.close = AsyncMock()
-    mock_dg_ws.send = AsyncMock()
+    settings = base_settings
 
     # Simulate an error during iteration
-    async def error_iter():
-        raise RuntimeError("boom")
-        yield  # noqa
-
-    mock_dg_ws.__aiter__ = lambda self: error_iter()
-
-    mock_connect = AsyncMock(return_value=mock_dg_ws)
-    monkeypatch.setattr("app.services.deepgram_agent.connect", mock_connect)
+    dg_ws = FakeDeepgramWS(error=RuntimeError("boom"))
+    monkeypatch.setattr(_dga, "connect", connect_returning(dg_ws))
 
     mock_generate = AsyncMock()
-    monkeypatch.setattr(
-        "app.services.deepgram_agent._generate_next_greeting", mock_generate
-    )
+    monkeypatch.setattr(_dga, "_generate_next_greeting", mock_generate)
 
     unregistered_keys: list[str] = []
     monkeypatch.setattr(
-        "app.services.deepgram_agent.session_registry.unregister",
-        lambda key: unregistered_keys.append(key),
+        _dga.session_registry, "unregister", lambda key: unregistered_keys.append(key)
     )
 
-    mock_twilio_ws = AsyncMock()
-    mock_twilio_ws.receive_text = AsyncMock(side_effect=WebSocketDisconnect())
-
     await run_agent_bridge(
-        mock_twilio_ws, "stream-err", settings=settings, call_id="err-call"
+        FakeTwilioWS(), "stream-err", settings=settings, call_id="err-call"
     )
 
     assert len(unregistered_keys) == 1
@@ -553,134 +477,93 @@ async def test_run_agent_bridge_unregisters_on_error(monkeypatch):
 # Enhanced prompt builder tests
 # ---------------------------------------------------------------------------
 
+_RETURNING_REQUIRED = (
+    "Bill",
+    "Caller context",
+    "Works on DeepClaw",
+    "voice AI platform",
+    "Recent calls",
+    "Morning standup",
+)
+_RETURNING_FORBIDDEN = ("First-caller bootstrap",)
+
+_FIRST_CALLER_REQUIRED = ("First-caller bootstrap", "haven't picked one yet")
+_FIRST_CALLER_FORBIDDEN = ("Caller context",)
 
-def test_returning_caller_prompt(tmp_path, monkeypatch):
+_NO_CALLS_REQUIRED = ("Caller context", "Bill")
+_NO_CALLS_FORBIDDEN = ("Recent calls",)
+
+
+def test_returning_caller_prompt(returning_caller, base_settings):
     """Known user with filled USER.md gets caller context in prompt."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    # Write filled USER.md
-    user_file = tmp_path / "user.md"
-    user_file.write_text(FILLED_USER_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.USER_MD_PATH", user_file)
-
-    # Write filled IDENTITY.md
-    identity_file = tmp_path / "identity.md"
-    identity_file.write_text(FILLED_IDENTITY_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.IDENTITY_MD_PATH", identity_file)
-
-    # Write CALLS.md
-    calls_file = tmp_path / "calls.md"
-    calls_file.write_text(SAMPLE_CALLS_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.CALLS_MD_PATH", calls_file)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="ret-123")
+    config = build_settings_config(base_settings, call_id="ret-123")
     prompt = config["agent"]["think"]["prompt"]
 
-    # Should contain caller context
-    assert "Bill" in prompt
-    assert "Caller context" in prompt
-    assert "Works on DeepClaw" in prompt
-    assert "voice AI platform" in prompt
-
-    # Should contain recent calls
-    assert "Recent calls" in prompt
-    assert "Morning standup" in prompt
+    # Caller context and recent calls, but no first-caller bootstrap
+    missing = [s for s in _RETURNING_REQUIRED if s not in prompt]
+    assert not missing, missing
+    present = [s for s in _RETURNING_FORBIDDEN if s in prompt]
+    assert not present, present
 
     # Should contain returning caller nudge
     assert "returning caller" in prompt.lower()
 
-    # Should NOT contain first-caller bootstrap
-    assert "First-caller bootstrap" not in prompt
-
     # Greeting should use name
     assert config["agent"]["greeting"] == "Hey Bill!"
 
 
-def test_first_caller_prompt(tmp_path, monkeypatch):
+def test_first_caller_prompt(empty_workspace, monkeypatch, base_settings):
     """No USER.md + blank IDENTITY.md triggers first-caller bootstrap."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
 
     # Write blank identity
-    identity_file = tmp_path / "identity.md"
-    identity_file.write_text(BLANK_IDENTITY_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.IDENTITY_MD_PATH", identity_file)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="first-123")
+    identity_file = empty_workspace / "identity.md"
+    identity_file.write_bytes(_BLANK_IDENTITY_MD_B)
+    monkeypatch.setattr(_dga, "IDENTITY_MD_PATH", identity_file)
+
+    config = build_settings_config(base_settings, call_id="first-123")
     prompt = config["agent"]["think"]["prompt"]
 
-    # Should contain bootstrap instructions
-    assert "First-caller bootstrap" in prompt
-    assert "haven't picked one yet" in prompt
-    assert "call me [name]" in prompt.lower()
+    # Bootstrap instructions, but no caller context
+    missing = [s for s in _FIRST_CALLER_REQUIRED if s not in prompt]
+    assert not missing, missing
+    present = [s for s in _FIRST_CALLER_FORBIDDEN if s in prompt]
+    assert not present, present
 
     # Should contain first-caller nudge
-    assert "first-time caller" in prompt.lower()
-
-    # Should NOT contain caller context
-    assert "Caller context" not in prompt
+    lowered = prompt.lower()
+    assert "call me [name]" in lowered
+    assert "first-time caller" in lowered
 
 
-def test_returning_caller_no_calls_md(tmp_path, monkeypatch):
+def test_returning_caller_no_calls_md(returning_caller, monkeypatch, base_settings):
     """Known user without CALLS.md still gets caller context, no recent calls section."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    user_file = tmp_path / "user.md"
-    user_file.write_text(FILLED_USER_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.USER_MD_PATH", user_file)
+    monkeypatch.setattr(_dga, "CALLS_MD_PATH", returning_caller / "nope-calls.md")
 
-    identity_file = tmp_path / "identity.md"
-    identity_file.write_text(FILLED_IDENTITY_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.IDENTITY_MD_PATH", identity_file)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="ret-no-calls")
+    config = build_settings_config(base_settings, call_id="ret-no-calls")
     prompt = config["agent"]["think"]["prompt"]
 
-    assert "Caller context" in prompt
-    assert "Bill" in prompt
-    assert "Recent calls" not in prompt
+    missing = [s for s in _NO_CALLS_REQUIRED if s not in prompt]
+    assert not missing, missing
+    present = [s for s in _NO_CALLS_FORBIDDEN if s in prompt]
+    assert not present, present
 
 
-def test_action_nudges_disabled(tmp_path, monkeypatch):
+def test_action_nudges_disabled(empty_workspace, base_settings):
     """When ENABLE_ACTION_NUDGES=False, no nudge lines in prompt."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        ENABLE_ACTION_NUDGES=False,
-        _env_file=None,
-    )
+    settings = base_settings.model_copy(update={"ENABLE_ACTION_NUDGES": False})
     config = build_settings_config(settings, call_id="no-nudge")
     prompt = config["agent"]["think"]["prompt"]
 
     assert "Nudge:" not in prompt
 
 
-def test_action_nudges_enabled_first_caller(tmp_path, monkeypatch):
+def test_action_nudges_enabled_first_caller(empty_workspace, base_settings):
     """First caller with nudges enabled gets the first-caller nudge."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        ENABLE_ACTION_NUDGES=True,
-        FIRST_CALLER_NUDGE_WINDOW_SEC=20,
-        _env_file=None,
+    settings = base_settings.model_copy(
+        update={
+            "ENABLE_ACTION_NUDGES": True,
+            "FIRST_CALLER_NUDGE_WINDOW_SEC": 20,
+        }
     )
     config = build_settings_config(settings, call_id="nudge-first")
     prompt = config["agent"]["think"]["prompt"]
@@ -689,23 +572,10 @@ def test_action_nudges_enabled_first_caller(tmp_path, monkeypatch):
     assert "20 seconds" in prompt
 
 
-def test_returning_caller_nudge_window(tmp_path, monkeypatch):
+def test_returning_caller_nudge_window(returning_caller, base_settings):
     """Returning caller nudge uses the configured window."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    user_file = tmp_path / "user.md"
-    user_file.write_text(FILLED_USER_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.USER_MD_PATH", user_file)
-
-    identity_file = tmp_path / "identity.md"
-    identity_file.write_text(FILLED_IDENTITY_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.IDENTITY_MD_PATH", identity_file)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        RETURNING_CALLER_NUDGE_WINDOW_SEC=60,
-        _env_file=None,
+    settings = base_settings.model_copy(
+        update={"RETURNING_CALLER_NUDGE_WINDOW_SEC": 60}
     )
     config = build_settings_config(settings, call_id="nudge-ret")
     prompt = config["agent"]["think"]["prompt"]
@@ -714,63 +584,34 @@ def test_returning_caller_nudge_window(tmp_path, monkeypatch):
     assert "60 seconds" in prompt
 
 
-def test_prompt_contains_utc_time(tmp_path, monkeypatch):
+def test_prompt_contains_utc_time(empty_workspace, base_settings):
     """Prompt always includes current UTC time."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="time-test")
+    config = build_settings_config(base_settings, call_id="time-test")
     prompt = config["agent"]["think"]["prompt"]
 
     assert "UTC" in prompt
 
 
-def test_prompt_contains_timezone_when_known(tmp_path, monkeypatch):
+def test_prompt_contains_timezone_when_known(returning_caller, base_settings):
     """When USER.md has a timezone, it appears in the prompt."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    user_file = tmp_path / "user.md"
-    user_file.write_text(FILLED_USER_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.USER_MD_PATH", user_file)
-
-    identity_file = tmp_path / "identity.md"
-    identity_file.write_text(FILLED_IDENTITY_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.IDENTITY_MD_PATH", identity_file)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="tz-test")
+    config = build_settings_config(base_settings, call_id="tz-test")
     prompt = config["agent"]["think"]["prompt"]
 
     assert "America/New_York" in prompt
 
 
-def test_blank_user_md_treated_as_first_caller(tmp_path, monkeypatch):
+def test_blank_user_md_treated_as_first_caller(
+    empty_workspace, monkeypatch, base_settings
+):
     """A USER.md that exists but has only placeholders is treated as first caller."""
-    _mock_workspace_empty(monkeypatch, tmp_path)
-
-    user_file = tmp_path / "user.md"
-    user_file.write_text(BLANK_USER_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.USER_MD_PATH", user_file)
+    (empty_workspace / "USER.md").write_bytes(_BLANK_USER_MD_B)
 
     # Blank identity too
-    identity_file = tmp_path / "identity.md"
-    identity_file.write_text(BLANK_IDENTITY_MD)
-    monkeypatch.setattr("app.services.deepgram_agent.IDENTITY_MD_PATH", identity_file)
-
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="blank-user")
+    identity_file = empty_workspace / "identity.md"
+    identity_file.write_bytes(_BLANK_IDENTITY_MD_B)
+    monkeypatch.setattr(_dga, "IDENTITY_MD_PATH", identity_file)
+
+    config = build_settings_config(base_settings, call_id="blank-user")
     prompt = config["agent"]["think"]["prompt"]
 
     # Should be first-caller (blank USER.md + blank IDENTITY.md)
@@ -778,13 +619,8 @@ def test_blank_user_md_treated_as_first_caller(tmp_path, monkeypatch):
     assert "Caller context" not in prompt
 
 
-def test_build_settings_config_includes_end_call_function():
-    settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="test-token",
-        _env_file=None,
-    )
-    config = build_settings_config(settings, call_id="test123")
+def test_build_settings_config_includes_end_call_function(base_settings):
+    config = build_settings_config(base_settings, call_id="test123")
     functions = config["agent"]["think"].get("functions", [])
     names = [f["name"] for f in functions]
     assert "end_call" in names
@@ -792,3 +628,11 @@ def test_build_settings_config_includes_end_call_function():
     end_call = next(f for f in functions if f["name"] == "end_call")
     assert "farewell" in end_call["parameters"]["properties"]
     assert "farewell" in end_call["parameters"]["required"]
+
+
+def test_build_inject_message():
+    payload = build_inject_message("Are you still there?")
+    assert json.loads(payload) == {
+        "type": "InjectAgentMessage",
+        "message": "Are you still there?",
+    }
@@ -1,98 +1,109 @@
 import asyncio
-from unittest.mock import AsyncMock, patch
+import json
+from unittest.mock import AsyncMock
 
 import httpx
 import pytest
 
-from app.services.filler import generate_filler_phrase
+from app.services.filler import (
+    _INFLIGHT,
+    _STATIC_HEADERS,
+    _WAITERS,
+    _build_prompt,
+    _get_client,
+    generate_filler_phrase,
+)
 
 ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
 
 
-@pytest.mark.asyncio
-async def test_generate_filler_phrase_success():
-    """Returns a phrase on successful Anthropic response."""
-    mock_response = httpx.Response(
-        200,
-        json={
-            "content": [{"type": "text", "text": "Let me look into that."}],
-            "model": "claude-haiku-4-5-20251001",
-            "role": "assistant",
-        },
-        request=httpx.Request("POST", ANTHROPIC_URL),
+@pytest.fixture
+async def anthropic_api(monkeypatch):
+    """Route the filler's shared client through ``httpx.MockTransport``.
+
+    Call ``install(handler)``; it returns the list of requests the handler saw.
+    """
+    clients: list[httpx.AsyncClient] = []
+
+    def install(handler) -> list[httpx.Request]:
+        seen: list[httpx.Request] = []
+
+        async def recording_handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            result = handler(request)
+            return await result if asyncio.iscoroutine(result) else result
+
+        client = httpx.AsyncClient(
+            transport=httpx.MockTransport(recording_handler), headers=_STATIC_HEADERS
+        )
+        clients.append(client)
+        monkeypatch.setattr("app.services.filler._client", client)
+        return seen
+
+    yield install
+    for client in clients:
+        await client.aclose()
+
+
+def _reply(text: str):
+    """Handler returning a single Anthropic text block."""
+    return lambda request: httpx.Response(
+        200, json={"content": [{"type": "text", "text": text}], "role": "assistant"}
     )
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    mock_client.post = AsyncMock(return_value=mock_response)
 
-    with patch("app.services.filler.httpx.AsyncClient", return_value=mock_client):
-        result = await generate_filler_phrase("What's the weather like?", "sk-ant-test")
+
+@pytest.mark.asyncio
+async def test_generate_filler_phrase_success(anthropic_api):
+    """Returns a phrase on successful Anthropic response."""
+    seen = anthropic_api(_reply("Let me look into that."))
+    result = await generate_filler_phrase("What's the weather like?", "sk-ant-test")
 
     assert result == "Let me look into that."
 
     # Verify direct Anthropic API call
-    call_kwargs = mock_client.post.call_args[1]
-    assert call_kwargs["headers"]["x-api-key"] == "sk-ant-test"
-    assert call_kwargs["headers"]["anthropic-version"] == "2023-06-01"
-    body = call_kwargs["json"]
+    (request,) = seen
+    assert str(request.url) == ANTHROPIC_URL
+    assert request.headers["x-api-key"] == "sk-ant-test"
+    assert request.headers["anthropic-version"] == "2023-06-01"
+    body = json.loads(request.content)
     assert body["model"] == "claude-haiku-4-5-20251001"
     assert body["max_tokens"] == 50
     assert "weather" in body["messages"][0]["content"]
 
 
 @pytest.mark.asyncio
-async def test_generate_filler_phrase_includes_user_message_in_prompt():
+async def test_generate_filler_phrase_includes_user_message_in_prompt(anthropic_api):
     """The prompt references the user's actual message."""
-    mock_response = httpx.Response(
-        200,
-        json={
-            "content": [{"type": "text", "text": "Checking on that."}],
-            "role": "assistant",
-        },
-        request=httpx.Request("POST", ANTHROPIC_URL),
-    )
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    mock_client.post = AsyncMock(return_value=mock_response)
+    seen = anthropic_api(_reply("Checking on that."))
+    await generate_filler_phrase("Schedule a meeting for Tuesday", "sk-ant-test")
 
-    with patch("app.services.filler.httpx.AsyncClient", return_value=mock_client):
-        await generate_filler_phrase("Schedule a meeting for Tuesday", "sk-ant-test")
-
-    prompt = mock_client.post.call_args[1]["json"]["messages"][0]["content"]
+    prompt = json.loads(seen[0].content)["messages"][0]["content"]
     assert "Schedule a meeting for Tuesday" in prompt
 
 
 @pytest.mark.asyncio
-async def test_generate_filler_phrase_network_error():
+async def test_generate_filler_phrase_network_error(anthropic_api):
     """Returns None on network failure."""
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    mock_client.post = AsyncMock(side_effect=httpx.ConnectError("connection refused"))
 
-    with patch("app.services.filler.httpx.AsyncClient", return_value=mock_client):
-        result = await generate_filler_phrase("Hello", "sk-ant-test")
+    def refuse(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    anthropic_api(refuse)
+    result = await generate_filler_phrase("Hello", "sk-ant-test")
 
     assert result is None
 
 
 @pytest.mark.asyncio
-async def test_generate_filler_phrase_non_ok_status():
+async def test_generate_filler_phrase_non_ok_status(anthropic_api):
     """Returns None on HTTP error response."""
-    mock_response = httpx.Response(
-        500,
-        json={"error": {"type": "internal_error", "message": "Internal server error"}},
-        request=httpx.Request("POST", ANTHROPIC_URL),
+    anthropic_api(
+        lambda request: httpx.Response(
+            500,
+            json={"error": {"type": "internal_error", "message": "Internal server error"}},
+        )
     )
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    mock_client.post = AsyncMock(return_value=mock_response)
-
-    with patch("app.services.filler.httpx.AsyncClient", return_value=mock_client):
-        result = await generate_filler_phrase("Hello", "sk-ant-test")
+    result = await generate_filler_phrase("Hello", "sk-ant-test")
 
     assert result is None
 
@@ -105,63 +116,122 @@ async def test_generate_filler_phrase_empty_api_key():
 
 
 @pytest.mark.asyncio
-async def test_generate_filler_phrase_empty_content():
+async def test_generate_filler_phrase_empty_content(anthropic_api):
     """Returns None if response has no content blocks."""
-    mock_response = httpx.Response(
-        200,
-        json={"content": [], "role": "assistant"},
-        request=httpx.Request("POST", ANTHROPIC_URL),
+    anthropic_api(
+        lambda request: httpx.Response(200, json={"content": [], "role": "assistant"})
     )
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    mock_client.post = AsyncMock(return_value=mock_response)
-
-    with patch("app.services.filler.httpx.AsyncClient", return_value=mock_client):
-        result = await generate_filler_phrase("Hello", "sk-ant-test")
+    result = await generate_filler_phrase("Hello", "sk-ant-test")
 
     assert result is None
 
 
 @pytest.mark.asyncio
-async def test_generate_filler_phrase_timeout():
+async def test_generate_filler_phrase_timeout(anthropic_api, monkeypatch):
     """Returns None if Anthropic call exceeds hard timeout."""
+    monkeypatch.setattr("app.services.filler.HARD_TIMEOUT_S", 0.01)
 
-    async def slow_post(*args, **kwargs):
-        await asyncio.sleep(5.0)  # Way past the 2s timeout
-        return httpx.Response(
-            200,
-            json={"content": [{"type": "text", "text": "Late."}]},
-        )
+    async def hang(request):
+        await asyncio.Event().wait()  # Only the timeout ends this
 
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    mock_client.post = slow_post
-
-    with patch("app.services.filler.httpx.AsyncClient", return_value=mock_client):
-        result = await generate_filler_phrase("Hello", "sk-ant-test")
+    anthropic_api(hang)
+    result = await generate_filler_phrase("Hello", "sk-ant-test")
 
     assert result is None
 
 
 @pytest.mark.asyncio
-async def test_generate_filler_phrase_strips_whitespace():
+async def test_generate_filler_phrase_strips_whitespace(anthropic_api):
     """Strips leading/trailing whitespace from the response."""
-    mock_response = httpx.Response(
-        200,
-        json={
-            "content": [{"type": "text", "text": "  Let me check.  \n"}],
-            "role": "assistant",
-        },
-        request=httpx.Request("POST", ANTHROPIC_URL),
-    )
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
-    mock_client.post = AsyncMock(return_value=mock_response)
-
-    with patch("app.services.filler.httpx.AsyncClient", return_value=mock_client):
-        result = await generate_filler_phrase("Hello", "sk-ant-test")
+    anthropic_api(_reply("  Let me check.  \n"))
+    result = await generate_filler_phrase("Hello", "sk-ant-test")
 
     assert result == "Let me check."
+
+
+@pytest.mark.asyncio
+async def test_generate_filler_phrase_reuses_shared_client(monkeypatch):
+    monkeypatch.setattr("app.services.filler._client", None)
+    created = []
+
+    def fake_client(**kwargs):
+        client = AsyncMock()
+        client.post = AsyncMock(side_effect=httpx.ConnectError("refused"))
+        created.append(client)
+        return client
+
+    monkeypatch.setattr("app.services.filler.httpx.AsyncClient", fake_client)
+    await generate_filler_phrase("Hello", "sk-ant-test")
+    await generate_filler_phrase("Hello", "sk-ant-test")
+
+    assert len(created) == 1
+    assert created[0].post.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_client_sends_static_headers(monkeypatch):
+    monkeypatch.setattr("app.services.filler._client", None)
+    client = _get_client()
+    try:
+        assert client.headers["anthropic-version"] == "2023-06-01"
+        assert client.headers["content-type"] == "application/json"
+    finally:
+        await client.aclose()
+
+
+def test_build_prompt_quotes_user_message():
+    prompt = _build_prompt("Where's my order?")
+    assert 'The user just said: "Where\'s my order?"' in prompt
+    assert prompt.endswith("Output ONLY the phrase. End with a period.")
+
+
+@pytest.mark.asyncio
+async def test_coalesces_duplicate_inflight(anthropic_api):
+    """Concurrent calls for the same message share one Anthropic request."""
+    release = asyncio.Event()
+
+    async def gated(request):
+        await release.wait()
+        return _reply("Hmm, one sec.")(request)
+
+    seen = anthropic_api(gated)
+    tasks = [
+        asyncio.create_task(generate_filler_phrase("Hello", "sk-ant-test"))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0.01)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results == ["Hmm, one sec."] * 5
+    assert len(seen) == 1
+    assert not _INFLIGHT and not _WAITERS
+
+
+@pytest.mark.asyncio
+async def test_cancelling_last_waiter_cancels_request(anthropic_api):
+    """The shared request outlives one cancelled caller but not the last."""
+    started = asyncio.Event()
+    aborted = asyncio.Event()
+
+    async def hang(request):
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            aborted.set()
+            raise
+
+    anthropic_api(hang)
+    first = asyncio.create_task(generate_filler_phrase("Hello", "sk-ant-test"))
+    second = asyncio.create_task(generate_filler_phrase("Hello", "sk-ant-test"))
+    await started.wait()
+
+    first.cancel()
+    await asyncio.sleep(0)
+    assert not aborted.is_set()
+
+    second.cancel()
+    await asyncio.wait_for(aborted.wait(), timeout=1.0)
+    assert first.cancelled() and second.cancelled()
+    assert not _INFLIGHT and not _WAITERS
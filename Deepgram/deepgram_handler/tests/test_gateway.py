@@ -1,28 +1,37 @@
 """Tests for OpenClaw gateway WebSocket RPC helper."""
 
+import asyncio
 import json
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from app.services.gateway import call_gateway
+from app.services.gateway import call_gateway, gateway_connection
 
 
 class FakeWebSocket:
-    """Minimal fake WebSocket that records sent messages and returns scripted responses."""
+    """Minimal fake WebSocket that records sent messages and returns scripted responses.
+
+    Each send releases the scripted messages up to and including the next
+    ``res``, so replies never arrive before the request they answer.
+    """
 
     def __init__(self, responses: list[dict]):
-        self._responses = [json.dumps(r) for r in responses]
-        self._response_idx = 0
+        self._script = list(responses)
+        self._inbox: asyncio.Queue[dict] = asyncio.Queue()
         self.sent: list[dict] = []
 
     async def send(self, data: str) -> None:
         self.sent.append(json.loads(data))
+        while self._script:
+            msg = self._script.pop(0)
+            self._inbox.put_nowait(msg)
+            if msg["type"] == "res":
+                break
 
     async def recv(self) -> str:
-        msg = self._responses[self._response_idx]
-        self._response_idx += 1
-        return msg
+        # Serialize on read so scripted replies that are never read cost nothing.
+        return json.dumps(await self._inbox.get())
 
     async def __aenter__(self):
         return self
@@ -90,7 +99,7 @@ async def test_call_gateway_sends_rpc():
     assert result == {"sessions": []}
 
     # Verify websockets.connect was called with the right URL
-    mock_connect.assert_called_once_with("ws://localhost:18789")
+    mock_connect.assert_called_once_with("ws://localhost:18789", open_timeout=5.0)
 
     # Get the fake_ws from the context manager
     ws = mock_connect.return_value
@@ -177,7 +186,7 @@ async def test_call_gateway_skips_events():
 
 
 @pytest.mark.asyncio
-async def test_call_gateway_returns_none_on_connect_failure():
+async def test_call_gateway_returns_none_on_connect_failure(caplog):
     ids = iter(["connect-id-4"])
 
     responses = [
@@ -201,3 +210,59 @@ async def test_call_gateway_returns_none_on_connect_failure():
         )
 
     assert result is None
+    assert "Gateway connect failed: bad token" in caplog.text
+    assert not any(r.exc_info for r in caplog.records)
+
+
+@pytest.mark.asyncio
+async def test_call_gateway_ignores_non_response_frames_with_matching_id():
+    ids = iter(["connect-id-6", "request-id-6"])
+
+    responses = [
+        _hello_ok("connect-id-6"),
+        {"type": "req", "id": "request-id-6", "method": "echo", "params": {}},
+        _method_response("request-id-6", {"sessions": []}),
+    ]
+
+    with (
+        patch("app.services.gateway.websockets.connect", return_value=FakeWebSocket(responses)),
+        patch("app.services.gateway.uuid.uuid4", side_effect=ids),
+    ):
+        result = await call_gateway(
+            method="sessions.list",
+            params={},
+            gateway_url="ws://localhost:18789",
+            gateway_token="test-token",
+        )
+
+    assert result == {"sessions": []}
+
+
+@pytest.mark.asyncio
+async def test_gateway_connection_reuses_socket_for_several_calls():
+    """One handshake, then each call is matched to its response by id."""
+    ids = iter(["connect-id-5", "request-id-5a", "request-id-5b"])
+
+    responses = [
+        _hello_ok("connect-id-5"),
+        _method_response("request-id-5a", {"sessions": [{"key": "child:1"}]}),
+        {"type": "event", "event": "tick", "payload": {"ts": 12345}},
+        _method_response("request-id-5b", {"status": "ok"}),
+    ]
+
+    with (
+        patch("app.services.gateway.websockets.connect", return_value=FakeWebSocket(responses)) as mock_connect,
+        patch("app.services.gateway.uuid.uuid4", side_effect=ids),
+    ):
+        async with gateway_connection(gateway_token="test-token") as conn:
+            listed = await conn.call("sessions.list", {})
+            notified = await conn.call("agent", {"sessionKey": "child:1"})
+
+    assert listed == {"sessions": [{"key": "child:1"}]}
+    assert notified == {"status": "ok"}
+    mock_connect.assert_called_once()
+    assert [m["method"] for m in mock_connect.return_value.sent] == [
+        "connect",
+        "sessions.list",
+        "agent",
+    ]
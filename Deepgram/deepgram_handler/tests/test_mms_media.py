@@ -1,12 +1,16 @@
 """Tests for MMS media extraction and multimodal content building."""
 
+import asyncio
 import base64
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock
 
 import pytest
 from starlette.datastructures import FormData, ImmutableMultiDict
 
 from app.services.mms_media import build_message_content
+from tests.helpers.fakes import FakeStreamResp
+
+MMS_HTTPX_CLIENT = "app.services.mms_media.httpx.AsyncClient"
 
 
 def _form(**kwargs) -> FormData:
@@ -29,16 +33,9 @@ async def test_no_nummedia_returns_body():
 
 
 @pytest.mark.asyncio
-async def test_image_mms_returns_multimodal():
+async def test_image_mms_returns_multimodal(mock_httpx_client):
     fake_image = b"\xff\xd8\xff\xe0fake-jpeg"
-    mock_resp = MagicMock()
-    mock_resp.content = fake_image
-    mock_resp.raise_for_status = MagicMock()
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_resp
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    mock_httpx_client(FakeStreamResp(fake_image), target=MMS_HTTPX_CLIENT)
 
     form = _form(
         Body="look at this",
@@ -47,8 +44,7 @@ async def test_image_mms_returns_multimodal():
         MediaContentType0="image/jpeg",
     )
 
-    with patch("app.services.mms_media.httpx.AsyncClient", return_value=mock_client):
-        result = await build_message_content(form)
+    result = await build_message_content(form)
 
     assert isinstance(result, list)
     assert len(result) == 2
@@ -59,16 +55,9 @@ async def test_image_mms_returns_multimodal():
 
 
 @pytest.mark.asyncio
-async def test_image_only_no_body():
+async def test_image_only_no_body(mock_httpx_client):
     fake_image = b"\x89PNG"
-    mock_resp = MagicMock()
-    mock_resp.content = fake_image
-    mock_resp.raise_for_status = MagicMock()
-
-    mock_client = AsyncMock()
-    mock_client.get.return_value = mock_resp
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    mock_httpx_client(FakeStreamResp(fake_image), target=MMS_HTTPX_CLIENT)
 
     form = _form(
         Body="",
@@ -77,8 +66,7 @@ async def test_image_only_no_body():
         MediaContentType0="image/png",
     )
 
-    with patch("app.services.mms_media.httpx.AsyncClient", return_value=mock_client):
-        result = await build_message_content(form)
+    result = await build_message_content(form)
 
     assert isinstance(result, list)
     assert len(result) == 1
@@ -86,7 +74,44 @@ async def test_image_only_no_body():
 
 
 @pytest.mark.asyncio
-async def test_unsupported_media_type():
+async def test_multi_image_parallel(monkeypatch):
+    """All image downloads are in flight before any of them completes."""
+    started = 0
+    all_started = asyncio.Event()
+
+    class GatedStream(FakeStreamResp):
+        async def __aenter__(self):
+            nonlocal started
+            started += 1
+            if started == 3:
+                all_started.set()
+            await all_started.wait()
+            return self
+
+    client = AsyncMock()
+    client.__aenter__.return_value = client
+    client.stream = lambda method, url: GatedStream(url.encode())
+    monkeypatch.setattr(MMS_HTTPX_CLIENT, lambda *args, **kwargs: client)
+
+    urls = [f"https://api.twilio.com/media/img{i}.png" for i in range(3)]
+    form = _form(
+        Body="",
+        NumMedia="3",
+        **{f"MediaUrl{i}": url for i, url in enumerate(urls)},
+        **{f"MediaContentType{i}": "image/png" for i in range(3)},
+    )
+
+    result = await asyncio.wait_for(build_message_content(form), timeout=1.0)
+
+    assert started == 3
+    assert [part["image_url"]["url"] for part in result] == [
+        f"data:image/png;base64,{base64.b64encode(url.encode()).decode('ascii')}"
+        for url in urls
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unsupported_media_type(monkeypatch):
     form = _form(
         Body="",
         NumMedia="1",
@@ -94,24 +119,39 @@ async def test_unsupported_media_type():
         MediaContentType0="video/mp4",
     )
 
-    # No HTTP mock needed since unsupported types don't trigger download
-    mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    def no_client(*args, **kwargs):
+        raise AssertionError("unsupported media should not open an HTTP client")
+
+    monkeypatch.setattr(MMS_HTTPX_CLIENT, no_client)
 
-    with patch("app.services.mms_media.httpx.AsyncClient", return_value=mock_client):
-        result = await build_message_content(form)
+    result = await build_message_content(form)
 
     assert isinstance(result, list)
     assert result[0] == {"type": "text", "text": "[Unsupported media type: video/mp4]"}
 
 
 @pytest.mark.asyncio
-async def test_image_download_failure_graceful():
-    mock_client = AsyncMock()
-    mock_client.get.side_effect = Exception("connection timeout")
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+async def test_negative_nummedia_ignores_media(monkeypatch):
+    form = _form(
+        Body="hi",
+        NumMedia="-1",
+        MediaUrl0="https://api.twilio.com/media/img.jpg",
+        MediaContentType0="image/jpeg",
+    )
+
+    def no_client(*args, **kwargs):
+        raise AssertionError("negative NumMedia should not fetch media")
+
+    monkeypatch.setattr(MMS_HTTPX_CLIENT, no_client)
+
+    result = await build_message_content(form)
+
+    assert result == [{"type": "text", "text": "hi"}]
+
+
+@pytest.mark.asyncio
+async def test_image_download_failure_graceful(mock_httpx_client):
+    mock_httpx_client(exc=Exception("connection timeout"), target=MMS_HTTPX_CLIENT)
 
     form = _form(
         Body="",
@@ -120,8 +160,7 @@ async def test_image_download_failure_graceful():
         MediaContentType0="image/jpeg",
     )
 
-    with patch("app.services.mms_media.httpx.AsyncClient", return_value=mock_client):
-        result = await build_message_content(form)
+    result = await build_message_content(form)
 
     assert isinstance(result, list)
     assert result[0] == {"type": "text", "text": "[Failed to load image: image/jpeg]"}
@@ -1,59 +1,65 @@
 import asyncio
 import json
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from fastapi.testclient import TestClient
 
-from app.main import app
-from app.routers.openclaw_proxy import _extract_last_user_message, _filtered_stream
+from app.routers.openclaw_proxy import (
+    _MARKER_PREFIX,
+    _STRIP_MARKERS,
+    _extract_last_user_message,
+    _filtered_stream,
+)
 from app.services import session_registry
+from tests.helpers.fakes import FakeUpstreamResp
 
 
 @pytest.fixture
-def client():
-    return TestClient(app)
+def proxy_settings(monkeypatch, base_settings):
+    """Serve ``base_settings`` with *overrides* to the proxy router."""
 
+    def install(**overrides):
+        settings = base_settings.model_copy(update=overrides)
+        monkeypatch.setattr("app.routers.openclaw_proxy.get_settings", lambda: settings)
+        return settings
 
-def test_proxy_chat_completions_forwards_request(client, monkeypatch):
-    mock_resp = MagicMock()
-    mock_resp.status_code = 200
-    mock_resp.headers = {"content-type": "application/json"}
+    return install
 
-    async def aiter_bytes():
-        yield b'{"choices":[{"message":{"content":"hi"}}]}'
 
-    mock_resp.aiter_bytes = aiter_bytes
-    mock_resp.aclose = AsyncMock()
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route the proxy's httpx client to *send*; returns the client mock."""
+
+    def install(send) -> AsyncMock:
+        mock_client = AsyncMock()
+        mock_client.build_request = MagicMock(return_value=MagicMock())
+        mock_client.send = send
+        mock_client.aclose = AsyncMock()
+        monkeypatch.setattr(
+            "app.routers.openclaw_proxy.httpx.AsyncClient", lambda **kw: mock_client
+        )
+        return mock_client
 
-    mock_request = MagicMock()
-    mock_client = AsyncMock()
-    mock_client.build_request = MagicMock(return_value=mock_request)
-    mock_client.send = AsyncMock(return_value=mock_resp)
-    mock_client.aclose = AsyncMock()
+    return install
 
-    # Ensure no session is registered so filler logic is skipped
-    monkeypatch.setattr(
-        "app.routers.openclaw_proxy.get_settings",
-        lambda: __import__("app.config", fromlist=["Settings"]).Settings(
-            DEEPGRAM_API_KEY="test-key",
-            OPENCLAW_GATEWAY_TOKEN="gw-token",
-            FILLER_THRESHOLD_MS=0,
-            _env_file=None,
-        ),
+
+def test_proxy_chat_completions_forwards_request(client, proxy_settings, upstream):
+    upstream_resp = FakeUpstreamResp(
+        b'{"choices":[{"message":{"content":"hi"}}]}', content_type="application/json"
     )
+    mock_client = upstream(AsyncMock(return_value=upstream_resp))
 
-    with patch(
-        "app.routers.openclaw_proxy.httpx.AsyncClient", return_value=mock_client
-    ):
-        response = client.post(
-            "/v1/chat/completions",
-            json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
-            headers={
-                "Authorization": "Bearer test-token",
-                "x-openclaw-session-key": "agent:main:abc123",
-            },
-        )
+    # Ensure no session is registered so filler logic is skipped
+    proxy_settings(FILLER_THRESHOLD_MS=0)
+
+    response = client.post(
+        "/v1/chat/completions",
+        json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
+        headers={
+            "Authorization": "Bearer test-token",
+            "x-openclaw-session-key": "agent:main:abc123",
+        },
+    )
 
     assert response.status_code == 200
     assert response.json()["choices"][0]["message"]["content"] == "hi"
@@ -62,6 +68,7 @@ def test_proxy_chat_completions_forwards_request(client, monkeypatch):
     mock_client.build_request.assert_called_once()
     call_args = mock_client.build_request.call_args
     assert call_args[0] == ("POST", "http://localhost:18789/v1/chat/completions")
+    assert upstream_resp.closed
 
 
 # ---------------------------------------------------------------------------
@@ -87,16 +94,14 @@ async def _async_chunks(chunks: list[bytes]):
 async def test_filtered_stream_strips_current_message_marker():
     raw = b'data: {"choices":[{"delta":{"content":"[Current message - respond to this]Hello"}}]}\n\n'
     result = await _collect(_filtered_stream(_async_chunks([raw])))
-    assert b"[Current message - respond to this]" not in result
-    assert b"Hello" in result
+    assert result == b'data: {"choices":[{"delta":{"content":"Hello"}}]}\n\n'
 
 
 @pytest.mark.asyncio
 async def test_filtered_stream_strips_history_marker():
     raw = b'data: {"choices":[{"delta":{"content":"[Chat messages since your last reply - for context]Hi"}}]}\n\n'
     result = await _collect(_filtered_stream(_async_chunks([raw])))
-    assert b"[Chat messages since your last reply - for context]" not in result
-    assert b"Hi" in result
+    assert result == b'data: {"choices":[{"delta":{"content":"Hi"}}]}\n\n'
 
 
 @pytest.mark.asyncio
@@ -105,15 +110,78 @@ async def test_filtered_stream_marker_split_across_chunks():
     chunk1 = b'data: {"choices":[{"delta":{"content":"[Current message - '
     chunk2 = b'respond to this]Hello"}}]}\n\n'
     result = await _collect(_filtered_stream(_async_chunks([chunk1, chunk2])))
-    assert b"[Current message - respond to this]" not in result
-    assert b"Hello" in result
+    assert result == b'data: {"choices":[{"delta":{"content":"Hello"}}]}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_filtered_stream_byte_at_a_time():
+    """A marker fed one byte per chunk is stripped and nothing else is lost."""
+    raw = b'data: {"choices":[{"delta":{"content":"[Current message - respond to this]Hello"}}]}\n\n'
+    chunks = [raw[i : i + 1] for i in range(len(raw))]
+    result = await _collect(_filtered_stream(_async_chunks(chunks)))
+    assert result == raw.replace(b"[Current message - respond to this]", b"")
+
+
+@pytest.mark.asyncio
+async def test_filtered_stream_marker_split_after_bracket():
+    """A chunk ending in a lone "[" is held back until the marker completes."""
+    chunks = [b'data: {"content":"[', b'Current message - respond to this]Hi"}\n\n']
+    result = await _collect(_filtered_stream(_async_chunks(chunks)))
+    assert result == b'data: {"content":"Hi"}\n\n'
+
+
+@pytest.mark.asyncio
+async def test_filtered_stream_strips_both_markers_in_one_chunk():
+    raw = (
+        b'data: {"choices":[{"delta":{"content":"[Chat messages since your last reply - for context]'
+        b'A[Current message - respond to this]B"}}]}\n\n'
+    )
+    result = await _collect(_filtered_stream(_async_chunks([raw])))
+    assert result == b'data: {"choices":[{"delta":{"content":"AB"}}]}\n\n'
 
 
 @pytest.mark.asyncio
 async def test_filtered_stream_no_marker_passes_through():
     raw = b'data: {"choices":[{"delta":{"content":"Just a normal response"}}]}\n\n'
     result = await _collect(_filtered_stream(_async_chunks([raw])))
-    assert b"Just a normal response" in result
+    assert result == raw
+
+
+@pytest.mark.asyncio
+async def test_filtered_stream_passes_marker_free_chunks_unbuffered():
+    """Chunks that cannot hold a marker are passed through as-is."""
+    assert all(m.startswith(_MARKER_PREFIX) for m in _STRIP_MARKERS)
+    chunks = [
+        b'data: {"choices":[{"delta":{"content":"Hi"}}]}\n\n',
+        b'data: {"choices":[{"delta":{"content":" there"}}]}\n\n',
+    ]
+    out = [c async for c in _filtered_stream(_async_chunks(chunks))]
+    assert out == chunks
+
+
+@pytest.mark.asyncio
+async def test_filtered_stream_coalesces_reads_into_events():
+    """Partial reads are joined and yielded once per complete SSE event."""
+    chunks = [b'data: {"choices":[{"delta":', b'{"content":"Hi"}}]}\n', b"\n", b"data: [DONE]\n\n"]
+    out = [c async for c in _filtered_stream(_async_chunks(chunks))]
+    assert out == [b'data: {"choices":[{"delta":{"content":"Hi"}}]}\n\n', b"data: [DONE]\n\n"]
+
+
+@pytest.mark.asyncio
+async def test_filtered_stream_forwards_events_when_reads_split_them():
+    """Each read forwards the events it completes; only the partial tail waits."""
+    events = [b'data: {"choices":[{"delta":{"content":"%d"}}]}\n\n' % i for i in range(3)]
+    chunks = [events[0] + events[1][:10], events[1][10:] + events[2][:5], events[2][5:]]
+    out = [c async for c in _filtered_stream(_async_chunks(chunks))]
+    assert out == events
+
+
+@pytest.mark.asyncio
+async def test_filtered_stream_flushes_large_non_sse_body():
+    """A body with no event boundary is still forwarded before it ends."""
+    body = b"x" * 5000
+    out = [c async for c in _filtered_stream(_async_chunks([body, b"tail"]))]
+    assert out == [body, b"tail"]
 
 
 @pytest.mark.asyncio
@@ -123,8 +191,7 @@ async def test_filtered_stream_preserves_done_sentinel():
         b"data: [DONE]\n\n",
     ]
     result = await _collect(_filtered_stream(_async_chunks(chunks)))
-    assert b"hi" in result
-    assert b"[DONE]" in result
+    assert result == b"".join(chunks)
 
 
 # ---------------------------------------------------------------------------
@@ -158,131 +225,101 @@ def test_extract_last_user_message_multimodal():
     assert _extract_last_user_message(body) == "Describe this"
 
 
+def test_extract_last_user_message_long_history():
+    """Only the last user turn matters, however long the history before it."""
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i}"}
+        for i in range(200)
+    ]
+    history.append({"role": "user", "content": [{"type": "text", "text": "Last {one}"}]})
+    body = json.dumps({"messages": history, "stream": True}, separators=(",", ":")).encode()
+    assert _extract_last_user_message(body) == "Last {one}"
+
+
+def test_extract_last_user_message_spaced_json_falls_back():
+    """Bodies that don't start user turns with '{"role":"user"' are fully parsed."""
+    body = json.dumps(
+        {"messages": [{"content": "First", "role": "user"}, {"role": "user", "content": "Second"}]}
+    ).encode()
+    assert _extract_last_user_message(body) == "Second"
+
+
 # ---------------------------------------------------------------------------
 # Filler injection proxy tests
 # ---------------------------------------------------------------------------
 
 
 @pytest.mark.asyncio
-async def test_proxy_injects_filler_on_slow_response(monkeypatch):
+async def test_proxy_injects_filler_on_slow_response(ac, proxy_settings, upstream):
     """When response is slow and a session is registered, filler is injected."""
-    from httpx import AsyncClient
-    from app.config import Settings
-
     # Register a mock Deepgram WS
     mock_dg_ws = AsyncMock()
+    injected = asyncio.Event()
+    mock_dg_ws.send.side_effect = lambda message: injected.set()
     session_registry.register("agent:main:slow-call", mock_dg_ws)
 
     # Configure settings with low threshold for test speed
-    test_settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
+    proxy_settings(
         FILLER_THRESHOLD_MS=50,  # 50ms for fast test
         FILLER_PHRASES="One moment...,Working on it.",
         FILLER_DYNAMIC=False,  # Disable Haiku for this test
-        _env_file=None,
-    )
-    monkeypatch.setattr(
-        "app.routers.openclaw_proxy.get_settings", lambda: test_settings
     )
 
-    # Simulate a slow OpenClaw response (200ms delay before response)
+    # Simulate a slow OpenClaw response: reply only once the filler is in
     async def slow_send(request, *, stream=False):
-        await asyncio.sleep(0.2)  # 200ms > 50ms threshold
-        resp = MagicMock()
-        resp.status_code = 200
-        resp.headers = {"content-type": "text/event-stream"}
-
-        async def aiter_bytes():
-            yield b'data: {"choices":[{"delta":{"content":"Hello"}}]}\n\n'
-            yield b"data: [DONE]\n\n"
-
-        resp.aiter_bytes = aiter_bytes
-        resp.aclose = AsyncMock()
-        return resp
-
-    mock_client = AsyncMock()
-    mock_client.build_request = MagicMock(return_value=MagicMock())
-    mock_client.send = slow_send
-    mock_client.aclose = AsyncMock()
-    monkeypatch.setattr(
-        "app.routers.openclaw_proxy.httpx.AsyncClient", lambda **kw: mock_client
-    )
+        await asyncio.wait_for(injected.wait(), timeout=1.0)
+        return FakeUpstreamResp(
+            b'data: {"choices":[{"delta":{"content":"Hello"}}]}\n\n',
+            b"data: [DONE]\n\n",
+        )
 
-    from httpx import ASGITransport
+    upstream(slow_send)
 
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
-        resp = await test_client.post(
-            "/v1/chat/completions",
-            json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
-            headers={"x-openclaw-session-key": "agent:main:slow-call"},
-        )
+    resp = await ac.post(
+        "/v1/chat/completions",
+        json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
+        headers={"x-openclaw-session-key": "agent:main:slow-call"},
+    )
 
     assert resp.status_code == 200
 
     # Filler should have been injected
     mock_dg_ws.send.assert_called_once()
-    injected = json.loads(mock_dg_ws.send.call_args[0][0])
-    assert injected["type"] == "InjectAgentMessage"
-    assert injected["message"] in ["One moment...", "Working on it."]
+    injected_msg = json.loads(mock_dg_ws.send.call_args[0][0])
+    assert injected_msg["type"] == "InjectAgentMessage"
+    assert injected_msg["message"] in ["One moment...", "Working on it."]
 
     # Cleanup
     session_registry.unregister("agent:main:slow-call")
 
 
 @pytest.mark.asyncio
-async def test_proxy_skips_filler_on_fast_response(monkeypatch):
+async def test_proxy_skips_filler_on_fast_response(ac, proxy_settings, upstream):
     """When response is fast, no filler is injected."""
-    from httpx import AsyncClient
-    from app.config import Settings
-
     mock_dg_ws = AsyncMock()
     session_registry.register("agent:main:fast-call", mock_dg_ws)
 
-    test_settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
+    proxy_settings(
         FILLER_THRESHOLD_MS=500,  # 500ms threshold
         FILLER_PHRASES="One moment...",
         FILLER_DYNAMIC=False,
-        _env_file=None,
-    )
-    monkeypatch.setattr(
-        "app.routers.openclaw_proxy.get_settings", lambda: test_settings
     )
 
     # Fast response (no delay)
-    async def fast_send(request, *, stream=False):
-        resp = MagicMock()
-        resp.status_code = 200
-        resp.headers = {"content-type": "text/event-stream"}
-
-        async def aiter_bytes():
-            yield b'data: {"choices":[{"delta":{"content":"Quick response"}}]}\n\n'
-            yield b"data: [DONE]\n\n"
-
-        resp.aiter_bytes = aiter_bytes
-        resp.aclose = AsyncMock()
-        return resp
-
-    mock_client = AsyncMock()
-    mock_client.build_request = MagicMock(return_value=MagicMock())
-    mock_client.send = fast_send
-    mock_client.aclose = AsyncMock()
-    monkeypatch.setattr(
-        "app.routers.openclaw_proxy.httpx.AsyncClient", lambda **kw: mock_client
+    upstream(
+        AsyncMock(
+            return_value=FakeUpstreamResp(
+                b'data: {"choices":[{"delta":{"content":"Quick response"}}]}\n\n',
+                b"data: [DONE]\n\n",
+            )
+        )
     )
 
-    from httpx import ASGITransport
-
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
-        resp = await test_client.post(
-            "/v1/chat/completions",
-            json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
-            headers={"x-openclaw-session-key": "agent:main:fast-call"},
-        )
+    resp = await ac.post(
+        "/v1/chat/completions",
+        json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
+        headers={"x-openclaw-session-key": "agent:main:fast-call"},
+    )
 
     assert resp.status_code == 200
 
@@ -294,108 +331,59 @@ async def test_proxy_skips_filler_on_fast_response(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_proxy_skips_filler_when_no_session(monkeypatch):
+async def test_proxy_skips_filler_when_no_session(ac, proxy_settings, upstream):
     """When no session is registered for the key, no filler logic runs."""
-    from httpx import AsyncClient
-    from app.config import Settings
-
-    test_settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
+    proxy_settings(
         FILLER_THRESHOLD_MS=50,
         FILLER_PHRASES="One moment...",
         FILLER_DYNAMIC=False,
-        _env_file=None,
-    )
-    monkeypatch.setattr(
-        "app.routers.openclaw_proxy.get_settings", lambda: test_settings
     )
 
-    async def fast_send(request, *, stream=False):
-        resp = MagicMock()
-        resp.status_code = 200
-        resp.headers = {"content-type": "application/json"}
-
-        async def aiter_bytes():
-            yield b'{"choices":[{"message":{"content":"hi"}}]}'
-
-        resp.aiter_bytes = aiter_bytes
-        resp.aclose = AsyncMock()
-        return resp
-
-    mock_client = AsyncMock()
-    mock_client.build_request = MagicMock(return_value=MagicMock())
-    mock_client.send = fast_send
-    mock_client.aclose = AsyncMock()
-    monkeypatch.setattr(
-        "app.routers.openclaw_proxy.httpx.AsyncClient", lambda **kw: mock_client
+    upstream(
+        AsyncMock(
+            return_value=FakeUpstreamResp(
+                b'{"choices":[{"message":{"content":"hi"}}]}',
+                content_type="application/json",
+            )
+        )
     )
 
-    from httpx import ASGITransport
-
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
-        resp = await test_client.post(
-            "/v1/chat/completions",
-            json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
-            headers={"x-openclaw-session-key": "agent:main:no-session"},
-        )
+    resp = await ac.post(
+        "/v1/chat/completions",
+        json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
+        headers={"x-openclaw-session-key": "agent:main:no-session"},
+    )
 
     # Should succeed without any filler injection (no crash, no side effects)
     assert resp.status_code == 200
 
 
 @pytest.mark.asyncio
-async def test_proxy_skips_filler_when_threshold_zero(monkeypatch):
+async def test_proxy_skips_filler_when_threshold_zero(ac, proxy_settings, upstream):
     """Filler disabled when threshold is 0."""
-    from httpx import AsyncClient
-    from app.config import Settings
-
     mock_dg_ws = AsyncMock()
     session_registry.register("agent:main:disabled", mock_dg_ws)
 
-    test_settings = Settings(
-        DEEPGRAM_API_KEY="test-key",
-        OPENCLAW_GATEWAY_TOKEN="gw-token",
+    proxy_settings(
         FILLER_THRESHOLD_MS=0,  # Disabled
         FILLER_PHRASES="One moment...",
         FILLER_DYNAMIC=False,
-        _env_file=None,
-    )
-    monkeypatch.setattr(
-        "app.routers.openclaw_proxy.get_settings", lambda: test_settings
     )
 
-    async def slow_send(request, *, stream=False):
-        await asyncio.sleep(0.1)
-        resp = MagicMock()
-        resp.status_code = 200
-        resp.headers = {"content-type": "text/event-stream"}
-
-        async def aiter_bytes():
-            yield b'data: {"choices":[{"delta":{"content":"Slow"}}]}\n\n'
-
-        resp.aiter_bytes = aiter_bytes
-        resp.aclose = AsyncMock()
-        return resp
-
-    mock_client = AsyncMock()
-    mock_client.build_request = MagicMock(return_value=MagicMock())
-    mock_client.send = slow_send
-    mock_client.aclose = AsyncMock()
-    monkeypatch.setattr(
-        "app.routers.openclaw_proxy.httpx.AsyncClient", lambda **kw: mock_client
+    # No timer is armed at threshold 0, so the reply delay is irrelevant.
+    upstream(
+        AsyncMock(
+            return_value=FakeUpstreamResp(
+                b'data: {"choices":[{"delta":{"content":"Slow"}}]}\n\n'
+            )
+        )
     )
 
-    from httpx import ASGITransport
-
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as test_client:
-        resp = await test_client.post(
-            "/v1/chat/completions",
-            json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
-            headers={"x-openclaw-session-key": "agent:main:disabled"},
-        )
+    resp = await ac.post(
+        "/v1/chat/completions",
+        json={"model": "test", "messages": [{"role": "user", "content": "hello"}]},
+        headers={"x-openclaw-session-key": "agent:main:disabled"},
+    )
 
     assert resp.status_code == 200
     mock_dg_ws.send.assert_not_called()
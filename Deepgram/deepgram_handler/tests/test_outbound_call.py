@@ -1,4 +1,4 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock
 
 import httpx
 import pytest
@@ -10,6 +10,9 @@ from app.services.outbound_call import (
 )
 
 
+_HTTPX_CLIENT = "app.services.outbound_call.httpx.AsyncClient"
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -23,31 +26,22 @@ def _mock_response(json_body: dict, status_code: int = 200) -> MagicMock:
     return resp
 
 
-def _mock_async_client(response: MagicMock) -> AsyncMock:
-    client = AsyncMock()
-    client.post.return_value = response
-    client.__aenter__ = AsyncMock(return_value=client)
-    client.__aexit__ = AsyncMock(return_value=None)
-    return client
-
-
 # ---------------------------------------------------------------------------
 # make_call tests
 # ---------------------------------------------------------------------------
 
 
-async def test_make_call_posts_to_control_plane():
+async def test_make_call_posts_to_control_plane(mock_httpx_client):
     expected = {"sid": "CA123", "status": "queued"}
-    mock_client = _mock_async_client(_mock_response(expected))
+    mock_post = mock_httpx_client(_mock_response(expected), target=_HTTPX_CLIENT)
 
-    with patch("app.services.outbound_call.httpx.AsyncClient", return_value=mock_client):
-        result = await make_call(to="+15551234567", purpose="Remind about meeting")
+    result = await make_call(to="+15551234567", purpose="Remind about meeting")
 
     assert result["sid"] == "CA123"
     assert result["session_id"].startswith("outbound-")
 
-    mock_client.post.assert_called_once()
-    call_args = mock_client.post.call_args
+    mock_post.assert_called_once()
+    call_args = mock_post.call_args
     assert call_args[0][0] == "http://test-control-plane/api/voice/call"
 
     body = call_args[1]["json"]
@@ -56,25 +50,23 @@ async def test_make_call_posts_to_control_plane():
     assert "/twilio/outbound?sid=" in body["url"]
 
 
-async def test_make_call_does_not_send_from():
+async def test_make_call_does_not_send_from(mock_httpx_client):
     """The control plane owns the caller ID — no 'from' in the payload."""
     expected = {"sid": "CA456", "status": "queued"}
-    mock_client = _mock_async_client(_mock_response(expected))
+    mock_post = mock_httpx_client(_mock_response(expected), target=_HTTPX_CLIENT)
 
-    with patch("app.services.outbound_call.httpx.AsyncClient", return_value=mock_client):
-        result = await make_call(to="+15551234567", purpose="Order pizza")
+    result = await make_call(to="+15551234567", purpose="Order pizza")
 
-    body = mock_client.post.call_args[1]["json"]
+    body = mock_post.call_args[1]["json"]
     assert "from" not in body
     assert result["sid"] == "CA456"
 
 
-async def test_make_call_stores_context():
+async def test_make_call_stores_context(mock_httpx_client):
     expected = {"sid": "CA789", "status": "queued"}
-    mock_client = _mock_async_client(_mock_response(expected))
+    mock_httpx_client(_mock_response(expected), target=_HTTPX_CLIENT)
 
-    with patch("app.services.outbound_call.httpx.AsyncClient", return_value=mock_client):
-        result = await make_call(to="+15551234567", purpose="Check status")
+    result = await make_call(to="+15551234567", purpose="Check status")
 
     session_id = result["session_id"]
     # Context should have been consumed or still stored
@@ -84,46 +76,44 @@ async def test_make_call_stores_context():
     _outbound_calls.pop(session_id, None)
 
 
-async def test_make_call_raises_on_error():
+async def test_make_call_raises_on_error(mock_httpx_client):
     mock_resp = MagicMock()
     mock_resp.raise_for_status.side_effect = httpx.HTTPStatusError(
         "Server Error",
         request=MagicMock(),
         response=MagicMock(status_code=500),
     )
-    mock_client = _mock_async_client(mock_resp)
+    mock_httpx_client(mock_resp, target=_HTTPX_CLIENT)
 
-    with patch("app.services.outbound_call.httpx.AsyncClient", return_value=mock_client):
-        with pytest.raises(httpx.HTTPStatusError):
-            await make_call(to="+15551234567", purpose="fail")
+    with pytest.raises(httpx.HTTPStatusError):
+        await make_call(to="+15551234567", purpose="fail")
 
 
-async def test_make_call_cleans_up_context_on_failure():
+async def test_make_call_cleans_up_context_on_failure(mock_httpx_client):
     mock_resp = MagicMock()
     mock_resp.raise_for_status.side_effect = httpx.HTTPStatusError(
         "Server Error",
         request=MagicMock(),
         response=MagicMock(status_code=500),
     )
-    mock_client = _mock_async_client(mock_resp)
+    mock_httpx_client(mock_resp, target=_HTTPX_CLIENT)
 
     initial_count = len(_outbound_calls)
 
-    with patch("app.services.outbound_call.httpx.AsyncClient", return_value=mock_client):
-        with pytest.raises(httpx.HTTPStatusError):
-            await make_call(to="+15551234567", purpose="fail")
+    with pytest.raises(httpx.HTTPStatusError):
+        await make_call(to="+15551234567", purpose="fail")
 
     # Context should be cleaned up on failure
     assert len(_outbound_calls) == initial_count
 
 
-async def test_make_call_no_proxy_url_raises():
+async def test_make_call_no_proxy_url_raises(monkeypatch):
     mock_settings = MagicMock()
     mock_settings.TWILIO_PROXY_URL = ""
 
-    with patch("app.services.outbound_call.get_settings", return_value=mock_settings):
-        with pytest.raises(ValueError, match="TWILIO_PROXY_URL is not configured"):
-            await make_call(to="+15551234567", purpose="should fail")
+    monkeypatch.setattr("app.services.outbound_call.get_settings", lambda: mock_settings)
+    with pytest.raises(ValueError, match="TWILIO_PROXY_URL is not configured"):
+        await make_call(to="+15551234567", purpose="should fail")
 
 
 # ---------------------------------------------------------------------------
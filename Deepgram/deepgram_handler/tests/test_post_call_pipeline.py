@@ -1,24 +1,12 @@
 """Tests for transcript capture and post-call pipeline triggering."""
 
+import asyncio
 import json
-from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from app.services.workspace import TranscriptEntry
-
-
-async def _async_iter(items):
-    """Helper: yield items as an async iterator."""
-    for item in items:
-        yield item
-
-
-def _mock_dg_ws(messages):
-    """Create a mock Deepgram WS that yields messages as an async iterator."""
-    mock = AsyncMock()
-    mock.__aiter__ = lambda self: _async_iter(messages)
-    return mock
+from tests.helpers.fakes import FakeDeepgramWS, FakeTwilioWS
 
 
 @pytest.mark.asyncio
@@ -27,8 +15,7 @@ async def test_conversation_text_captured_in_transcript():
     from app.services.deepgram_agent import _deepgram_to_twilio
 
     transcript: list[TranscriptEntry] = []
-    stop_event = MagicMock()
-    stop_event.is_set = MagicMock(return_value=False)
+    stop_event = asyncio.Event()
 
     messages = [
         json.dumps(
@@ -37,10 +24,10 @@ async def test_conversation_text_captured_in_transcript():
         json.dumps({"type": "ConversationText", "role": "user", "content": "Hi there"}),
     ]
 
-    mock_twilio_ws = AsyncMock()
+    twilio_ws = FakeTwilioWS()
 
     await _deepgram_to_twilio(
-        _mock_dg_ws(messages), mock_twilio_ws, "test-stream", stop_event, transcript
+        FakeDeepgramWS(messages), twilio_ws, "test-stream", stop_event, transcript
     )
 
     assert len(transcript) == 2
@@ -55,18 +42,17 @@ async def test_transcript_none_does_not_crash():
     """When transcript is None, ConversationText events are still logged without error."""
     from app.services.deepgram_agent import _deepgram_to_twilio
 
-    stop_event = MagicMock()
-    stop_event.is_set = MagicMock(return_value=False)
+    stop_event = asyncio.Event()
 
     messages = [
         json.dumps({"type": "ConversationText", "role": "user", "content": "Hey"}),
     ]
 
-    mock_twilio_ws = AsyncMock()
+    twilio_ws = FakeTwilioWS()
 
     # Should not raise
     await _deepgram_to_twilio(
-        _mock_dg_ws(messages), mock_twilio_ws, "stream", stop_event, None
+        FakeDeepgramWS(messages), twilio_ws, "stream", stop_event, None
     )
 
 
@@ -76,18 +62,17 @@ async def test_non_conversation_events_not_captured():
     from app.services.deepgram_agent import _deepgram_to_twilio
 
     transcript: list[TranscriptEntry] = []
-    stop_event = MagicMock()
-    stop_event.is_set = MagicMock(return_value=False)
+    stop_event = asyncio.Event()
 
     messages = [
         json.dumps({"type": "UserStartedSpeaking"}),
         json.dumps({"type": "Warning", "description": "test warning"}),
     ]
 
-    mock_twilio_ws = AsyncMock()
+    twilio_ws = FakeTwilioWS()
 
     await _deepgram_to_twilio(
-        _mock_dg_ws(messages), mock_twilio_ws, "stream", stop_event, transcript
+        FakeDeepgramWS(messages), twilio_ws, "stream", stop_event, transcript
     )
 
     assert len(transcript) == 0
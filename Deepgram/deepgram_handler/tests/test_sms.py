@@ -2,20 +2,11 @@ import asyncio
 from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
-import pytest
-from fastapi.testclient import TestClient
-
-from app.main import app
 from app.services.sms_context import FALLBACK_MESSAGE, HOLDING_MESSAGE
 
 _NO_USER_MD = patch("app.services.sms_context.USER_MD_PATH", Path("/nonexistent/USER.md"))
 
 
-@pytest.fixture
-def client():
-    return TestClient(app)
-
-
 def test_inbound_sms_routes_through_openclaw(client):
     with (
         patch("app.routers.sms.ask_openclaw", AsyncMock(return_value="Hello from OpenClaw!")),
@@ -1,5 +1,5 @@
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -108,31 +108,27 @@ def test_truncate_custom_limit():
 
 
 @pytest.mark.asyncio
-async def test_ask_openclaw_returns_reply():
+async def test_ask_openclaw_returns_reply(mock_httpx_client):
     from app.services.sms_context import ask_openclaw
 
     mock_resp = MagicMock()
     mock_resp.json.return_value = {"choices": [{"message": {"content": "Hi there!"}}]}
     mock_resp.raise_for_status = MagicMock()
 
-    mock_client = AsyncMock()
-    mock_client.post.return_value = mock_resp
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=None)
+    mock_post = mock_httpx_client(
+        mock_resp, target="app.services.sms_context.httpx.AsyncClient"
+    )
 
     settings = MagicMock()
     settings.OPENCLAW_GATEWAY_TOKEN = "tok"
     settings.AGENT_THINK_MODEL = "model"
 
-    with (
-        patch("app.services.sms_context.httpx.AsyncClient", return_value=mock_client),
-        patch("app.services.sms_context.USER_MD_PATH", Path("/nonexistent/USER.md")),
-    ):
+    with patch("app.services.sms_context.USER_MD_PATH", Path("/nonexistent/USER.md")):
         result = await ask_openclaw(settings, "session-key", "hello")
 
     assert result == "Hi there!"
 
-    call_args = mock_client.post.call_args
+    call_args = mock_post.call_args
     headers = call_args[1]["headers"]
     assert headers["x-openclaw-session-key"] == "session-key"
     body = call_args[1]["json"]
@@ -2,6 +2,7 @@ from app.services.user_md_parser import (
     UserProfile,
     has_values,
     is_blank_identity,
+    may_be_placeholder,
     parse_calls_md,
     parse_user_markdown,
 )
@@ -105,6 +106,34 @@ def test_placeholder_stripping():
     assert profile.pronouns == ""
 
 
+def test_fields_after_context_are_ignored():
+    """Context ends at the first rule; nothing after it is parsed as a field."""
+    content = (
+        "- **Name:** Alice\n"
+        "## Context\n"
+        "Likes cats.\n"
+        "---\n"
+        "- **Timezone:** UTC\n"
+    )
+    profile = parse_user_markdown(content)
+    assert profile.name == "Alice"
+    assert profile.context == "Likes cats."
+    assert profile.timezone == ""
+
+
+def test_context_stops_at_top_level_heading():
+    content = "## Context\nLikes cats.\n### Pets\nTwo cats.\n# Footer\nIgnored."
+    profile = parse_user_markdown(content)
+    assert profile.context == "Likes cats.\n### Pets\nTwo cats."
+
+
+def test_context_heading_case_and_spacing():
+    assert parse_user_markdown("##   CONTEXT\nLikes cats.").context == "Likes cats."
+    assert parse_user_markdown("##\tcontext notes\nLikes cats.").context == "Likes cats."
+    assert parse_user_markdown("##Context\nLikes cats.").context == ""
+    assert parse_user_markdown("### Context\nLikes cats.").context == ""
+
+
 # ---------------------------------------------------------------------------
 # has_values
 # ---------------------------------------------------------------------------
@@ -166,6 +195,14 @@ def test_parse_calls_md_all():
     assert len(entries) == 4
 
 
+def test_parse_calls_md_non_positive_count():
+    """count <= 0 keeps the ``entries[-count:]`` slice semantics."""
+    assert len(parse_calls_md(SAMPLE_CALLS_MD, count=0)) == 4
+    entries = parse_calls_md(SAMPLE_CALLS_MD, count=-1)
+    assert len(entries) == 3
+    assert "2026-02-11" in entries[0]
+
+
 def test_parse_calls_md_empty():
     assert parse_calls_md("", count=3) == []
     assert parse_calls_md("   ", count=3) == []
@@ -239,3 +276,16 @@ def test_blank_identity_none_content():
 def test_blank_identity_no_name_field():
     content = "# IDENTITY.md\nSome stuff but no Name field"
     assert is_blank_identity(content) is True
+
+
+# ---------------------------------------------------------------------------
+# may_be_placeholder
+# ---------------------------------------------------------------------------
+
+
+def test_may_be_placeholder_checks_first_non_markup_char():
+    initials = frozenset("ow")
+    assert may_be_placeholder("  **(Optional)**", initials)
+    assert may_be_placeholder("What do they care about?", initials)
+    assert not may_be_placeholder("_Alice_", initials)
+    assert may_be_placeholder("  ** ", initials)  # nothing to reject on
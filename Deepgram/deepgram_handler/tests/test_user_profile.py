@@ -12,7 +12,7 @@ from app.services.user_profile import (
     parse_user_md,
     serialize_user_md,
 )
-from app.services.workspace import CallInfo, TranscriptEntry
+from app.services.workspace import CallInfo, TranscriptEntry, read_workspace_file
 
 
 # -- normalize_value --
@@ -57,6 +57,11 @@ def test_is_placeholder_false():
     assert is_placeholder("America/New_York") is False
 
 
+def test_is_placeholder_markup_wrapped():
+    assert is_placeholder("  **_Optional_**  ") is True
+    assert is_placeholder("_(Optional)_ extra") is False
+
+
 # -- parse_user_md --
 
 
@@ -196,11 +201,9 @@ def test_serialize_empty_profile():
 
 
 @pytest.mark.asyncio
-async def test_extract_user_profile_fills_empty(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
-
+async def test_extract_user_profile_fills_empty(workspace_dir):
     # Write empty template
-    user_path = tmp_path / "USER.md"
+    user_path = workspace_dir / "USER.md"
     user_path.write_text(
         "# USER.md - About Your Human\n\n"
         "- **Name:**\n"
@@ -232,15 +235,17 @@ async def test_extract_user_profile_fills_empty(tmp_path, monkeypatch):
         mock_llm.return_value = '{"name": "Bill", "callName": "Bill"}'
         await extract_user_profile(FakeSettings(), call_info)
 
+    prompt = mock_llm.call_args[0][1]
+    assert prompt.endswith(
+        "Transcript:\nAgent: What's your name?\nCaller: I'm Bill, you can call me Bill."
+    )
     content = user_path.read_text()
     assert "Bill" in content
 
 
 @pytest.mark.asyncio
-async def test_extract_user_profile_skips_when_populated(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
-
-    user_path = tmp_path / "USER.md"
+async def test_extract_user_profile_skips_when_populated(workspace_dir):
+    user_path = workspace_dir / "USER.md"
     user_path.write_text(
         "# USER.md - About Your Human\n\n"
         "- **Name:** Bill\n"
@@ -272,3 +277,46 @@ async def test_extract_user_profile_skips_when_populated(tmp_path, monkeypatch):
 
     # LLM should not have been called -- all key fields populated
     mock_llm.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_extract_user_profile_caches_populated_check(workspace_dir, monkeypatch):
+    user_path = workspace_dir / "USER.md"
+    user_path.write_text(
+        "- **Name:** Bill\n"
+        "- **What to call them:** Bill\n"
+        "- **Timezone:** UTC\n"
+        "- **Notes:** Likes coffee\n\n"
+        "## Context\n\nVoice AI work.\n"
+    )
+
+    class FakeSettings:
+        OPENCLAW_AGENT_ID = "main"
+        OPENCLAW_GATEWAY_TOKEN = "gw-token"
+
+    call_info = CallInfo(
+        call_id="abc123",
+        phone_number="+15551234567",
+        direction="inbound",
+        ended_at=1739480100.0,
+        transcript=[TranscriptEntry(1000.0, "user", "Hey")],
+    )
+
+    reads = []
+    real_read = read_workspace_file
+
+    def counting_read(path):
+        reads.append(path)
+        return real_read(path)
+
+    monkeypatch.setattr("app.services.user_profile.read_workspace_file", counting_read)
+
+    with patch(
+        "app.services.user_profile.call_anthropic", new_callable=AsyncMock
+    ) as mock_llm:
+        await extract_user_profile(FakeSettings(), call_info)
+        await extract_user_profile(FakeSettings(), call_info)
+
+    # Second call short-circuits on the cached mtime without re-reading
+    assert reads == [user_path]
+    mock_llm.assert_not_called()
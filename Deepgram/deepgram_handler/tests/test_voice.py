@@ -1,14 +1,3 @@
-import pytest
-from fastapi.testclient import TestClient
-
-from app.main import app
-
-
-@pytest.fixture
-def client():
-    return TestClient(app)
-
-
 def test_twilio_inbound_returns_twiml_with_stream(client):
     response = client.post(
         "/twilio/inbound",
@@ -1,5 +1,5 @@
 # tests/test_workspace.py
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock
 
 import httpx
 import pytest
@@ -37,24 +37,20 @@ def test_format_transcript_empty():
 # -- workspace_path --
 
 
-def test_workspace_path_main_agent(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
-
+def test_workspace_path_main_agent(workspace_dir):
     class FakeSettings:
         OPENCLAW_AGENT_ID = "main"
 
-    assert workspace_path(FakeSettings(), "USER.md") == tmp_path / "USER.md"
-
+    assert workspace_path(FakeSettings(), "USER.md") == workspace_dir / "USER.md"
 
-def test_workspace_path_sub_agent(tmp_path, monkeypatch):
-    monkeypatch.setattr("app.services.workspace.WORKSPACE_DIR", tmp_path)
 
+def test_workspace_path_sub_agent(workspace_dir):
     class FakeSettings:
         OPENCLAW_AGENT_ID = "voice-agent"
 
     assert (
         workspace_path(FakeSettings(), "USER.md")
-        == tmp_path / "voice-agent" / "USER.md"
+        == workspace_dir / "voice-agent" / "USER.md"
     )
 
 
@@ -115,7 +111,7 @@ def test_parse_json_response_empty():
 
 
 @pytest.mark.asyncio
-async def test_call_anthropic_success():
+async def test_call_anthropic_success(monkeypatch):
     mock_response = httpx.Response(
         200,
         json={
@@ -124,12 +120,10 @@ async def test_call_anthropic_success():
         request=httpx.Request("POST", "http://localhost:18789/v1/chat/completions"),
     )
     mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
     mock_client.post = AsyncMock(return_value=mock_response)
 
-    with patch("app.services.workspace.httpx.AsyncClient", return_value=mock_client):
-        result = await call_anthropic("gw-token", "Extract info", "You are helpful")
+    monkeypatch.setattr("app.services.workspace._client", mock_client)
+    result = await call_anthropic("gw-token", "Extract info", "You are helpful")
 
     assert result == "Summary here."
     call_kwargs = mock_client.post.call_args[1]
@@ -147,31 +141,46 @@ async def test_call_anthropic_empty_key():
 
 
 @pytest.mark.asyncio
-async def test_call_anthropic_http_error():
+async def test_call_anthropic_http_error(monkeypatch):
     mock_response = httpx.Response(
         500,
         json={"error": "internal"},
         request=httpx.Request("POST", "http://localhost:18789/v1/chat/completions"),
     )
     mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
     mock_client.post = AsyncMock(return_value=mock_response)
 
-    with patch("app.services.workspace.httpx.AsyncClient", return_value=mock_client):
-        result = await call_anthropic("test-key", "prompt", "system")
+    monkeypatch.setattr("app.services.workspace._client", mock_client)
+    result = await call_anthropic("test-key", "prompt", "system")
 
     assert result is None
 
 
 @pytest.mark.asyncio
-async def test_call_anthropic_network_error():
+async def test_call_anthropic_network_error(monkeypatch):
     mock_client = AsyncMock()
-    mock_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_client.__aexit__ = AsyncMock(return_value=False)
     mock_client.post = AsyncMock(side_effect=httpx.ConnectError("refused"))
 
-    with patch("app.services.workspace.httpx.AsyncClient", return_value=mock_client):
-        result = await call_anthropic("test-key", "prompt", "system")
+    monkeypatch.setattr("app.services.workspace._client", mock_client)
+    result = await call_anthropic("test-key", "prompt", "system")
 
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_call_anthropic_reuses_shared_client(monkeypatch):
+    monkeypatch.setattr("app.services.workspace._client", None)
+    created = []
+
+    def fake_client(**kwargs):
+        client = AsyncMock()
+        client.post = AsyncMock(side_effect=httpx.ConnectError("refused"))
+        created.append(client)
+        return client
+
+    monkeypatch.setattr("app.services.workspace.httpx.AsyncClient", fake_client)
+    await call_anthropic("test-key", "prompt", "system")
+    await call_anthropic("test-key", "prompt", "system")
+
+    assert len(created) == 1
+    assert created[0].post.await_count == 2
@@ -45,6 +45,6 @@ if [ "$i" -eq 90 ]; then
   exit 1
 fi
 
-# Start Twilio proxy in foreground
+# Start Twilio proxy in foreground (uvloop ships with uvicorn[standard])
 echo "Starting Twilio proxy..."
-exec /twilio-proxy/.venv/bin/uvicorn app.main:app --host 0.0.0.0 --port 8000 --app-dir /twilio-proxy
+exec /twilio-proxy/.venv/bin/uvicorn app.main:app --host 0.0.0.0 --port 8000 --loop uvloop --app-dir /twilio-proxy